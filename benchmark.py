@@ -0,0 +1,227 @@
+import numpy as np
+import argparse
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Render tanpa jendela; harus diset sebelum pygame diimpor (juga oleh proses worker)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import pymunk
+from simulation import SimulationEngine
+from scene_io import BINARY_SCENE_THRESHOLD, write_scene_atomic, read_scene
+
+try:
+    import resource
+except ImportError: # Windows: memori puncak tidak diukur
+    resource = None
+
+# --- Konfigurasi Benchmark ---
+BENCH_WORLD = (6000, 3000)
+BENCH_WARMUP_STEPS = 30
+BENCH_STEPS = 300
+BENCH_FRAMES = 120
+BENCH_THRESHOLD = 0.10 # perubahan relatif yang dianggap regresi
+BENCH_BASELINE = "benchmark_baseline.json"
+# Arah metrik: +1 = lebih besar lebih baik, -1 = lebih kecil lebih baik
+BENCH_METRICS = {
+    'steps_per_sec': 1,
+    'frame_ms': -1,
+    'frame_p99_ms': -1,
+    'import_ms': -1,
+    'first_frame_ms': -1,
+    'build_ms': -1,
+    'save_ms': -1,
+    'load_ms': -1,
+    'peak_rss_mb': -1,
+}
+
+# --- Scene Standar (primitif yang sama dengan alat sandbox) ---
+def grid_positions(count, spacing, margin=100, width=BENCH_WORLD[0]):
+    columns = max(1, int((width - 2 * margin) // spacing))
+    return [(margin + (i % columns) * spacing, margin + (i // columns) * spacing) for i in range(count)]
+
+def build_circles(engine, scale, rng):
+    for pos in grid_positions(int(1000 * scale), 90):
+        engine.add_circle(pos, 40)
+
+def build_box_stacks(engine, scale, rng):
+    stacks = max(1, int(15 * scale))
+    for stack in range(stacks):
+        x = 200 + stack * (BENCH_WORLD[0] - 400) / stacks
+        for level in range(20):
+            engine.add_box((x, 45 + level * 80), (80, 80))
+
+def build_polygons(engine, scale, rng):
+    for x, y in grid_positions(int(500 * scale), 110):
+        # Sudut terurut dengan jari-jari tetap selalu menghasilkan poligon konveks
+        count = int(rng.integers(3, 9))
+        angles = np.sort(rng.uniform(0, 2 * math.pi, count))
+        radius = rng.uniform(25, 45)
+        engine.add_polygon([(x + radius * math.cos(a), y + radius * math.sin(a)) for a in angles])
+
+def build_chains(engine, scale, rng, joint_type):
+    chains, links = max(1, int(10 * scale)), 100
+    for chain in range(chains):
+        y = 300 + chain * 250
+        bodies = [engine.add_circle((200 + i * 50, y), 10) for i in range(links)]
+        for a, b in zip(bodies, bodies[1:]):
+            engine.add_joint(joint_type, a, b, (0, 0), (0, 0))
+
+BENCH_SCENES = {
+    'circles': build_circles,
+    'box_stacks': build_box_stacks,
+    'polygons': build_polygons,
+    'pin_chains': lambda engine, scale, rng: build_chains(engine, scale, rng, 'pin'),
+    'spring_chains': lambda engine, scale, rng: build_chains(engine, scale, rng, 'spring'),
+}
+
+def build_scene(name, scale=1.0, seed=0):
+    engine = SimulationEngine(*BENCH_WORLD)
+    BENCH_SCENES[name](engine, scale, np.random.default_rng(seed))
+    return engine
+
+# --- Pengukuran (satu proses per scene, agar memori puncak terpisah) ---
+def measure_render(engine, frames):
+    # Kembalikan waktu per frame (ms), latensi impor main, dan latensi dari init UI sampai frame pertama
+    start = time.perf_counter()
+    import main # impor tidak menginisialisasi subsistem pygame; display dan font dimuat init_ui
+    import_ms = (time.perf_counter() - start) * 1000
+    ui_start = time.perf_counter()
+    main.init_ui()
+    screen = pygame.display.set_mode((main.WIDTH, main.HEIGHT))
+    camera = main.Camera()
+    # Seluruh dunia terlihat di area kiri panel UI
+    camera.zoom = min(main.UI_PANEL_X / engine.width, main.HEIGHT / engine.height)
+    camera.offset.x = engine.width / 2 - (main.UI_PANEL_X / 2 - main.WIDTH / 2) / camera.zoom
+    camera.offset.y = engine.height / 2
+    renderer = main.WorldRenderer(engine, camera)
+
+    times, first_frame_ms = [], math.nan
+    for _ in range(frames):
+        start = time.perf_counter()
+        engine.store_prev_poses()
+        engine.step()
+        screen.fill(main.COLOR_BG)
+        snapshot = engine.interpolated_snapshot(1.0)
+        renderer.draw_bodies(screen, snapshot, None)
+        renderer.draw_joints(screen, snapshot)
+        pygame.display.flip()
+        times.append(time.perf_counter() - start)
+        if len(times) == 1: first_frame_ms = (time.perf_counter() - ui_start) * 1000
+    return np.array(times) * 1000, import_ms, first_frame_ms
+
+def run_scene(name, scale=1.0, steps=BENCH_STEPS, frames=BENCH_FRAMES, seed=0):
+    start = time.perf_counter()
+    engine = build_scene(name, scale, seed)
+    build_ms = (time.perf_counter() - start) * 1000
+    engine.run(BENCH_WARMUP_STEPS)
+    steps_per_sec = engine.run(steps)
+    frame_ms, import_ms, first_frame_ms = measure_render(engine, frames)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Format sama dengan pilihan sandbox untuk ukuran scene ini
+        ext = ".npz" if len(engine.registry) > BINARY_SCENE_THRESHOLD else ".json"
+        filename = os.path.join(tmp, "scene" + ext)
+        start = time.perf_counter()
+        write_scene_atomic(filename, engine.scene_arrays())
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        SimulationEngine(*BENCH_WORLD).open_arrays(read_scene(filename), chunk_size=None).run()
+        load_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'objects': len(engine.registry),
+        'joints': len(engine.registry.joints),
+        'steps_per_sec': steps_per_sec,
+        'frame_ms': float(np.median(frame_ms)),
+        'frame_p99_ms': float(np.percentile(frame_ms, 99)),
+        'import_ms': import_ms,
+        'first_frame_ms': first_frame_ms,
+        'build_ms': build_ms,
+        'save_ms': save_ms,
+        'load_ms': load_ms,
+        # ru_maxrss dalam KB di Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else math.nan,
+    }
+
+def run_benchmarks(names, scale=1.0, steps=BENCH_STEPS, frames=BENCH_FRAMES):
+    results = {}
+    for name in names:
+        # Proses baru per scene: memori puncak dan cache tidak terbawa antar scene
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+            results[name] = pool.submit(run_scene, name, scale, steps, frames).result()
+        print(f"{name}: {results[name]['steps_per_sec']:.0f} steps/s, {results[name]['frame_ms']:.2f} ms/frame")
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'scale': scale, 'steps': steps, 'frames': frames,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'pymunk': pymunk.version, 'pygame': pygame.version.ver, 'numpy': np.__version__,
+        },
+        'results': results,
+    }
+
+# --- Perbandingan dengan Baseline ---
+def compare(report, baseline, threshold=BENCH_THRESHOLD):
+    # Satu baris per (scene, metrik) yang ada di keduanya; change > 0 berarti lebih baik
+    rows = []
+    for name, metrics in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None: continue
+        for metric, direction in BENCH_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if old is None or new is None or math.isnan(old) or math.isnan(new) or old == 0: continue
+            change = direction * (new - old) / old
+            rows.append({'scene': name, 'metric': metric, 'baseline': old, 'value': new,
+                         'change': change, 'regression': change < -threshold})
+    return rows
+
+def print_comparison(rows, threshold):
+    print(f"{'scene':<14} {'metric':<14} {'baseline':>10} {'value':>10} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['scene']:<14} {row['metric']:<14} {row['baseline']:>10.2f} {row['value']:>10.2f} {row['change']:>+8.1%}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+if __name__ == '__main__':
+    # Pemakaian: python benchmark.py [--scenes ...] [--scale S] [--baseline F] [--save-baseline]
+    parser = argparse.ArgumentParser(description="Benchmark canonical scenes and compare against a baseline.")
+    parser.add_argument('--scenes', nargs='+', choices=list(BENCH_SCENES), default=list(BENCH_SCENES))
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplier for object counts")
+    parser.add_argument('--steps', type=int, default=BENCH_STEPS, help="headless steps per scene")
+    parser.add_argument('--frames', type=int, default=BENCH_FRAMES, help="rendered frames per scene")
+    parser.add_argument('--baseline', default=BENCH_BASELINE)
+    parser.add_argument('--threshold', type=float, default=BENCH_THRESHOLD, help="relative change counted as a regression")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--out', default=f"benchmark_{int(time.time())}.json")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.scenes, args.scale, args.steps, args.frames)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results saved to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changed = [key for key in ('scale', 'steps', 'frames') if baseline['meta'].get(key) != report['meta'][key]]
+        if changed:
+            print(f"Warning: baseline was run with different {', '.join(changed)}; results are not comparable.")
+        if print_comparison(compare(report, baseline, args.threshold), args.threshold):
+            raise SystemExit(1)
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
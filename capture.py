@@ -0,0 +1,184 @@
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import pygame
+from simulation import SimulationEngine
+
+# --- Konfigurasi Tangkapan Frame ---
+CAPTURE_FPS = 60
+CAPTURE_SECONDS = 10.0
+CAPTURE_IMAGE_FORMATS = ['png', 'bmp', 'tga'] # bmp/tga tanpa kompresi: jauh lebih cepat ditulis dari png
+CAPTURE_QUEUE_SIZE = 8         # frame yang boleh menunggu ditulis (pool surface = antrean + jumlah writer)
+# png dikompresi di luar GIL: beberapa writer paralel agar ekspor tidak dibatasi satu core.
+# bmp/tga cukup satu writer; 'video' selalu satu karena urutan frame ke pipe harus terjaga
+CAPTURE_COMPRESSED_FORMATS = ['png']
+CAPTURE_WRITERS = min(4, os.cpu_count() or 1)
+# 'drop': frame dilewati saat semua surface masih antre (render tidak pernah menunggu);
+# 'block': render menunggu writer, tidak ada frame hilang (untuk ekspor offline)
+CAPTURE_DROP_POLICIES = ['drop', 'block']
+# Frame mentah di-pipe ke encoder lokal; {pix_fmt} {width} {height} {fps} {output} diisi saat mulai
+CAPTURE_ENCODER = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', '{pix_fmt}',
+                   '-s', '{width}x{height}', '-r', '{fps}', '-i', '-', '-pix_fmt', 'yuv420p', '{output}']
+
+# --- Penangkap Frame (pool surface offscreen, encoding di thread terpisah) ---
+class FrameCapture:
+    def __init__(self, path, size, fmt='png', fps=CAPTURE_FPS, queue_size=CAPTURE_QUEUE_SIZE, drop_policy='drop',
+                 encoder=CAPTURE_ENCODER, writers=CAPTURE_WRITERS):
+        # fmt 'png'/'bmp'/'tga': folder berisi frame_00000.<fmt>; 'video': frame mentah ke stdin encoder, path = file keluaran
+        if drop_policy not in CAPTURE_DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.path = path
+        self.size = size
+        self.fmt = fmt
+        self.fps = fps
+        self.drop_policy = drop_policy
+        self.encoder = encoder
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Render menggambar langsung ke surface dari pool; writer membaca buffer surface yang sama (tanpa salinan)
+        # Nama file dari indeks frame, jadi writer paralel boleh selesai tidak berurutan
+        if fmt not in CAPTURE_COMPRESSED_FORMATS: writers = 1
+        self.free = queue.Queue()
+        for _ in range(queue_size + writers):
+            self.free.put(pygame.Surface(size, 0, 32))
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None
+        self._process = None
+        self._lock = threading.Lock()
+        self._running = writers
+        self._threads = [threading.Thread(target=self._run, name=f"frame-writer-{i}", daemon=True) for i in range(writers)]
+
+    def start(self):
+        if self.fmt in CAPTURE_IMAGE_FORMATS:
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            # Urutan byte piksel surface 32-bit (little-endian): mask biru di byte terendah = 'bgr0'
+            masks = pygame.Surface((1, 1), 0, 32).get_masks()
+            pix_fmt = 'bgr0' if masks[2] == 0xff else 'rgb0'
+            fields = {'pix_fmt': pix_fmt, 'width': self.size[0], 'height': self.size[1], 'fps': self.fps, 'output': self.path}
+            if shutil.which(self.encoder[0]) is None:
+                raise FileNotFoundError(f"encoder '{self.encoder[0]}' not found on PATH; install it or capture to an image format")
+            self._process = subprocess.Popen([arg.format(**fields) for arg in self.encoder], stdin=subprocess.PIPE)
+        for thread in self._threads: thread.start()
+        print(f"Capturing frames to {self.path}")
+
+    def acquire(self):
+        # Surface untuk frame berikutnya, atau None bila frame ini dilewati (policy 'drop')
+        if self.drop_policy == 'block':
+            return self.free.get()
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return None
+
+    def submit(self, surface):
+        # Jangan menggambar ke surface setelah ini; kembali ke pool setelah ditulis
+        self.queue.put((self.captured, surface))
+        self.captured += 1
+
+    def stop(self, wait=True):
+        # Frame yang sudah diantre tetap ditulis; satu penanda berhenti per writer
+        for _ in self._threads: self.queue.put(None)
+        if wait:
+            for thread in self._threads: thread.join()
+
+    @property
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _run(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None: break
+                index, surface = item
+                try:
+                    if self.error is None: self._write(index, surface)
+                finally:
+                    self.free.put(surface)
+        finally:
+            with self._lock:
+                self._running -= 1
+                last = self._running == 0
+            if last and self._process:
+                try:
+                    self._process.stdin.close()
+                except OSError:
+                    pass # encoder sudah berhenti; galatnya sudah dicatat
+                self._process.wait()
+        if last: print(f"Capture stopped: {self.written} frames written, {self.dropped} dropped")
+
+    def _write(self, index, surface):
+        try:
+            if self.fmt in CAPTURE_IMAGE_FORMATS:
+                pygame.image.save(surface, os.path.join(self.path, f"frame_{index:05d}.{self.fmt}"))
+            else:
+                view = surface.get_view('2') # buffer piksel surface langsung ke pipe
+                try:
+                    self._process.stdin.write(view)
+                finally:
+                    del view
+            with self._lock:
+                self.written += 1
+        except (OSError, pygame.error) as e:
+            self.error = e
+            print(f"Error writing capture: {e}")
+
+# --- Ekspor Headless (langkah fisika tetap per frame, secepat writer mengizinkan) ---
+def capture_scene(scene_file, path, seconds=CAPTURE_SECONDS, fps=CAPTURE_FPS, fmt='png',
+                  queue_size=CAPTURE_QUEUE_SIZE, drop_policy='block', writers=CAPTURE_WRITERS):
+    from main import WIDTH, HEIGHT, COLOR_BG, Camera, WorldRenderer # impor tidak menginisialisasi pygame
+    engine = SimulationEngine(dt=1 / fps)
+    meta = engine.load_scene(scene_file)
+    if meta is None: return None
+    camera = Camera(viewport_width=WIDTH) # tanpa panel UI: seluruh frame adalah viewport
+    # Seluruh dunia terlihat di tengah frame
+    camera.zoom = min(WIDTH / engine.width, HEIGHT / engine.height)
+    camera.offset.x, camera.offset.y = engine.width / 2, engine.height / 2
+    renderer = WorldRenderer(engine, camera)
+
+    capture = FrameCapture(path, (WIDTH, HEIGHT), fmt, fps, queue_size, drop_policy, writers=writers)
+    try:
+        capture.start()
+    except OSError as e:
+        print(f"Error starting encoder: {e}")
+        return None
+    frames = int(seconds * fps)
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.step()
+        surface = capture.acquire()
+        if surface is None: continue
+        surface.fill(COLOR_BG)
+        snapshot = engine.pose_snapshot()
+        renderer.draw_bodies(surface, snapshot, None)
+        renderer.draw_joints(surface, snapshot)
+        capture.submit(surface)
+    capture.stop()
+    elapsed = time.perf_counter() - start
+    print(f"{frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} fps, {seconds / elapsed:.1f}x real time)")
+    return capture
+
+if __name__ == '__main__':
+    # Pemakaian: python capture.py scene.json output [--seconds S] [--fps N] [--format F] [--queue N] [--drop-policy P] [--writers N]
+    parser = argparse.ArgumentParser(description="Render a scene offscreen to a PNG sequence or an encoder.")
+    parser.add_argument('scene')
+    parser.add_argument('output', help="folder for image frames, or the video file with --format video")
+    parser.add_argument('--seconds', type=float, default=CAPTURE_SECONDS)
+    parser.add_argument('--fps', type=int, default=CAPTURE_FPS)
+    parser.add_argument('--format', choices=CAPTURE_IMAGE_FORMATS + ['video'], default='png',
+                        help="image sequence format, or 'video' to pipe raw frames to the encoder (ffmpeg)")
+    parser.add_argument('--queue', type=int, default=CAPTURE_QUEUE_SIZE, help="frames waiting to be written")
+    parser.add_argument('--drop-policy', choices=CAPTURE_DROP_POLICIES, default='block')
+    parser.add_argument('--writers', type=int, default=CAPTURE_WRITERS, help="parallel writer threads for png")
+    args = parser.parse_args()
+
+    capture = capture_scene(args.scene, args.output, args.seconds, args.fps, args.format, args.queue, args.drop_policy, args.writers)
+    if capture is None or capture.error: sys.exit(1)
@@ -0,0 +1,88 @@
+import numpy as np
+import csv
+import os
+import queue
+import threading
+from simulation import RAW_METRICS
+
+# --- Konfigurasi Rekaman ---
+RECORD_QUEUE_SIZE = 512
+RECORD_CHUNK_STEPS = 600
+
+# --- Perekam Telemetri (streaming ke disk di thread terpisah) ---
+class TelemetryRecorder:
+    def __init__(self, path, fmt='npz', queue_size=RECORD_QUEUE_SIZE, chunk_steps=RECORD_CHUNK_STEPS):
+        # fmt 'csv': satu file CSV yang ditambah per chunk; 'npz': folder berisi chunk kolumnar
+        self.path = path
+        self.fmt = fmt
+        self.chunk_steps = chunk_steps
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pushed = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None
+        self._chunk_index = 0
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+
+    def start(self):
+        if self.fmt == 'npz':
+            os.makedirs(self.path, exist_ok=True)
+        self._thread.start()
+        print(f"Recording telemetry to {self.path}")
+
+    def push(self, step, sim_time, ids, values):
+        # Tidak pernah memblokir loop frame: jika antrean penuh, sampel dibuang dan dihitung
+        try:
+            self.queue.put_nowait((step, sim_time, ids, values))
+            self.pushed += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self, wait=True):
+        # Tanpa wait, sisa antrean ditulis di latar belakang
+        self.queue.put(None)
+        if wait: self._thread.join()
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        pending = []
+        csv_file = None
+        try:
+            if self.fmt == 'csv':
+                csv_file = open(self.path, 'w', newline='')
+                csv.writer(csv_file).writerow(['step', 'time', 'id'] + RAW_METRICS)
+            while True:
+                item = self.queue.get()
+                if item is None: break
+                pending.append(item)
+                if len(pending) >= self.chunk_steps:
+                    self._write_chunk(pending, csv_file)
+                    pending = []
+            if pending:
+                self._write_chunk(pending, csv_file)
+        except OSError as e:
+            self.error = e
+            print(f"Error writing telemetry: {e}")
+        finally:
+            if csv_file: csv_file.close()
+        print(f"Recording stopped: {self.written} steps written, {self.dropped} dropped")
+
+    def _write_chunk(self, samples, csv_file):
+        counts = [len(ids) for _, _, ids, _ in samples]
+        steps = np.repeat([step for step, _, _, _ in samples], counts)
+        times = np.repeat([sim_time for _, sim_time, _, _ in samples], counts)
+        ids = np.concatenate([ids for _, _, ids, _ in samples])
+        values = np.concatenate([values for _, _, _, values in samples]).reshape(-1, len(RAW_METRICS))
+
+        if self.fmt == 'csv':
+            table = np.column_stack((steps, times, ids, values))
+            np.savetxt(csv_file, table, delimiter=',', fmt=['%d', '%.6f', '%d'] + ['%.6g'] * len(RAW_METRICS))
+        else:
+            columns = {key: values[:, i] for i, key in enumerate(RAW_METRICS)}
+            filename = os.path.join(self.path, f"chunk_{self._chunk_index:05d}.npz")
+            np.savez(filename, step=steps, time=times, id=ids, **columns)
+        self._chunk_index += 1
+        self.written += len(samples)
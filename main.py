@@ -1,13 +1,17 @@
+import time
+IMPORT_START = time.perf_counter() # latensi impor dilaporkan bersama frame pertama
+
 import pygame
 import pymunk
-import math
-import json
+import numpy as np
 import csv
-from collections import deque
-import time
-
-# --- Inisialisasi Utama ---
-pygame.init()
+import os
+from simulation import WORLD_WIDTH, WORLD_HEIGHT, SimulationEngine, PhysicsClock, GraphBuffer, PathTracer, PhysicsWorker, TrajectoryPredictor, PHYSICS_THREADS, PARAMETER_RANGES
+from scene_io import BINARY_SCENE_THRESHOLD, SceneWriter
+from export import TelemetryRecorder
+from capture import FrameCapture, CAPTURE_QUEUE_SIZE
+from profiler import FrameProfiler
+from quality import QualityController
 
 # --- Konfigurasi & Konstanta ---
 WIDTH, HEIGHT = 1600, 900
@@ -27,25 +31,83 @@ RED = (220, 50, 50)
 GREEN = (50, 200, 50)
 BLUE = (50, 100, 220)
 
+# Rekaman telemetri: 'npz' (chunk kolumnar) atau 'csv'
+RECORD_FORMAT = 'npz'
+
+# Tangkapan layar per frame (F5): 'png'/'bmp'/'tga' = folder gambar, 'video' = frame mentah ke ffmpeg.
+# 'drop' melewati frame saat writer tertinggal agar laju frame tetap; 'block' menunggu writer.
+# bmp tanpa kompresi agar 'drop' tidak kehilangan sebagian besar frame pada 60 FPS; png untuk ekspor offline (capture.py)
+CAPTURE_FORMAT = 'bmp'
+CAPTURE_DROP_POLICY = 'drop'
+
+# Mode multi-core: solver multi-thread dan langkah fisika di thread terpisah dari render
+PHYSICS_THREADED = False
+
+# Simpan otomatis tiap N detik (0 = nonaktif), ditulis di thread latar belakang
+AUTOSAVE_INTERVAL = 0
+AUTOSAVE_NAME = "autosave"
+
+# Riwayat untuk putar ulang: SPACE jeda, panah kiri/kanan menggulir (SHIFT = satu detik)
+HISTORY_ENABLED = True
+
+# Alat spawn massal: objek diambil dari pool engine (dialokasikan di muka)
+EMITTER_RADIUS = 10
+EMITTER_RATE = 1000    # objek per detik (default slider)
+EMITTER_SPEED = 300    # kecepatan awal maksimum (px/s), arah acak
+GRID_FILL_RADIUS = 10
+GRID_FILL_GAP = 2
+GRID_FILL_MAX = 20000
+POOL_RESERVE = 5000
+
+# Profiler per fase selalu aktif; F3 menampilkan overlay p50/p99, F4 menyimpan trace Chrome
+PROFILE_OVERLAY_REFRESH = 30 # frame antar pembaruan overlay
+
+# Kualitas adaptif: iterasi solver, substep, detail pegas, jejak dan refresh UI diturunkan saat frame
+# melewati anggaran 1/FPS, lalu dipulihkan saat ada ruang sisa (False = selalu kualitas penuh)
+QUALITY_ADAPTIVE = True
+QUALITY_LABELS = {
+    'iterations': "Solver iterations",
+    'max_substeps': "Max substeps",
+    'coil_segments': "Spring coil segments",
+    'tracer_stride': "Tracer point stride",
+    'ui_interval': "UI refresh every N frames",
+}
+
+# Prediksi lintasan body terpilih/diseret dan body yang ditabraknya (P menyalakan/mematikan);
+# horizon dan anggaran langkah diatur di simulation.py (PREDICT_HORIZON, PREDICT_STEP_BUDGET)
+PREDICT_ENABLED = False
+PREDICT_COLOR = (120, 200, 255)
+
 # UI
 UI_PANEL_WIDTH = 350
 UI_PANEL_X = WIDTH - UI_PANEL_WIDTH
 
-# Font
-FONT_NORMAL = pygame.font.Font(None, 24)
-FONT_TITLE = pygame.font.Font(None, 28)
-FONT_HEADER = pygame.font.Font(None, 36)
+# Font (dimuat oleh init_ui; mengimpor modul ini tidak menyentuh subsistem SDL)
+FONT_NORMAL = FONT_TITLE = FONT_HEADER = None
 
 # --- Kelas Kamera ---
 class Camera:
-    def __init__(self):
+    def __init__(self, viewport_width=UI_PANEL_X):
         self.offset = pygame.math.Vector2(0, 0)
         self.zoom = 1.0
+        self.viewport_width = viewport_width # lebar area dunia dari kiri layar (sandbox: sampai panel UI)
 
     def world_to_screen(self, world_pos):
         return (int((world_pos[0] - self.offset.x) * self.zoom + WIDTH / 2),
                 int((world_pos[1] - self.offset.y) * self.zoom + HEIGHT / 2))
 
+    def world_to_screen_array(self, world_points):
+        # Versi vektor dari world_to_screen untuk array (N, 2)
+        screen_points = (world_points - (self.offset.x, self.offset.y)) * self.zoom + (WIDTH / 2, HEIGHT / 2)
+        return screen_points.astype(np.int32)
+
+    def world_bounds(self, margin=0):
+        # Persegi dunia yang terlihat (viewport di kiri layar), dengan margin dalam piksel
+        half_w = (self.viewport_width / 2 + margin) / self.zoom
+        half_h = (HEIGHT / 2 + margin) / self.zoom
+        center_x = self.offset.x + (self.viewport_width / 2 - WIDTH / 2) / self.zoom
+        return pymunk.BB(center_x - half_w, self.offset.y - half_h, center_x + half_w, self.offset.y + half_h)
+
     def screen_to_world(self, screen_pos):
         return (int((screen_pos[0] - WIDTH / 2) / self.zoom + self.offset.x),
                 int((screen_pos[1] - HEIGHT / 2) / self.zoom + self.offset.y))
@@ -56,6 +118,281 @@ class Camera:
         self.zoom = max(0.1, min(self.zoom, 5.0))
         self.offset += (focus_point - self.offset) * (1 - self.zoom / old_zoom)
 
+# --- Level Detail (jari-jari body di layar, px) ---
+LOD_ROTATION_RADIUS = 6  # di bawah ini garis rotasi lingkaran tidak digambar
+LOD_POINT_RADIUS = 3     # di bawah ini body digambar sebagai titik/kotak kecil
+LOD_HEATMAP_RADIUS = 1.5 # median jari-jari di bawah ini: peta kepadatan menggantikan body
+HEATMAP_CELL = 6         # ukuran sel peta kepadatan (px)
+HEATMAP_LOW = (40, 70, 140)
+HEATMAP_HIGH = (255, 230, 120)
+HEATMAP_MODES = ['auto', 'on', 'off'] # F2 berganti mode
+
+# --- Renderer Dunia ---
+class WorldRenderer:
+    def __init__(self, engine, camera):
+        self.engine = engine
+        self.camera = camera
+        self._geometry_version = None
+        self.visible_rows = []
+        # Geometri layar body yang tidur: berlaku sampai body bangun atau kamera/daftar objek berubah
+        self._sleep_key = None
+        self._sleep_items = {}
+        self.coil_segments = 10 # 0 = pegas sebagai garis lurus
+        self.heatmap_mode = 'auto'
+        self._joint_key = None
+        self._coil_templates = {}
+
+    def _update_geometry(self, snapshot):
+        # Geometri lokal hanya dibangun ulang saat daftar objek berubah
+        if self._geometry_version == snapshot.version: return
+        circle_rows, radii, poly_rows, local_verts, counts = [], [], [], [], []
+        self.draw_order = [] # (lingkaran?, indeks) per baris registri
+        self.shape_rows = {}
+        self.body_rows = {}
+        for row, record in enumerate(snapshot.records):
+            self.shape_rows[record['shape']] = row
+            self.body_rows[record['shape'].body] = row
+            if record['type'] == 'circle':
+                self.draw_order.append((True, len(circle_rows)))
+                circle_rows.append(row)
+                radii.append(record['shape'].radius)
+            else:
+                verts = record['shape'].get_vertices()
+                self.draw_order.append((False, len(poly_rows)))
+                poly_rows.append(row)
+                local_verts.extend(verts)
+                counts.append(len(verts))
+        self.circle_rows = np.array(circle_rows, dtype=np.intp)
+        self.radii = np.array(radii, dtype=float)
+        self.poly_rows = np.array(poly_rows, dtype=np.intp)
+        self.local_verts = np.array(local_verts, dtype=float).reshape(-1, 2)
+        self.vert_counts = np.array(counts, dtype=np.intp)
+        self.vert_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.intp)
+        # Jari-jari pembatas per baris registri untuk level detail
+        self.body_radius = np.zeros(len(snapshot.records))
+        self.body_radius[self.circle_rows] = self.radii
+        if len(self.poly_rows):
+            norms = np.hypot(self.local_verts[:, 0], self.local_verts[:, 1])
+            self.body_radius[self.poly_rows] = np.maximum.reduceat(norms, self.vert_offsets[:-1])
+        self.median_radius = float(np.median(self.body_radius)) if len(self.body_radius) else 0.0
+        self._geometry_version = snapshot.version
+
+    def cull(self, snapshot):
+        # Tanya indeks spasial pymunk bentuk mana yang ada di layar
+        self._update_geometry(snapshot)
+        bounds = self.camera.world_bounds(margin=20)
+        if bounds.contains(pymunk.BB(0, 0, self.engine.width, self.engine.height)):
+            # Seluruh dunia terlihat (zoom jauh): semua baris, tanpa query indeks spasial
+            self.visible_rows = list(range(len(snapshot.records)))
+            return self.visible_rows
+        with self.engine.lock: # space bisa sedang dilangkahkan di thread fisika
+            shapes = self.engine.space.bb_query(bounds, pymunk.ShapeFilter())
+        self.visible_rows = sorted(self.shape_rows[shape] for shape in shapes if shape in self.shape_rows)
+        return self.visible_rows
+
+    def _sleeping_cache(self, snapshot):
+        # None bila sleeping nonaktif; cache dikosongkan saat kamera atau versi snapshot berubah
+        if snapshot.sleeping is None:
+            self._sleep_key, self._sleep_items = None, {}
+            return None
+        key = (self.camera.offset.x, self.camera.offset.y, self.camera.zoom, snapshot.version)
+        if key != self._sleep_key:
+            self._sleep_key, self._sleep_items = key, {}
+        return self._sleep_items
+
+    def use_heatmap(self):
+        if self.heatmap_mode == 'auto':
+            return self.median_radius * self.camera.zoom < LOD_HEATMAP_RADIUS
+        return self.heatmap_mode == 'on'
+
+    def draw_heatmap(self, screen, snapshot):
+        # Jumlah body per sel layar (bincount), warna skala log; sel kosong transparan
+        camera = self.camera
+        cols, rows = -(-camera.viewport_width // HEATMAP_CELL), -(-HEIGHT // HEATMAP_CELL)
+        screen_points = (snapshot.positions - (camera.offset.x, camera.offset.y)) * camera.zoom + (WIDTH / 2, HEIGHT / 2)
+        cells = np.floor(screen_points / HEATMAP_CELL).astype(np.intp)
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < cols) & (cells[:, 1] >= 0) & (cells[:, 1] < rows)
+        cells = cells[inside]
+        if not len(cells): return
+        counts = np.bincount(cells[:, 0] * rows + cells[:, 1], minlength=cols * rows).reshape(cols, rows)
+        level = np.log1p(counts) / np.log1p(counts.max())
+        rgb = np.array(HEATMAP_LOW) + level[..., None] * (np.array(HEATMAP_HIGH) - np.array(HEATMAP_LOW))
+        rgb[counts == 0] = 0
+        surf = pygame.surfarray.make_surface(rgb.astype(np.uint8))
+        surf.set_colorkey((0, 0, 0))
+        screen.blit(pygame.transform.scale(surf, (cols * HEATMAP_CELL, rows * HEATMAP_CELL)), (0, 0))
+
+    def _draw_points(self, screen, snapshot, rows, screen_radii):
+        # Body kecil dicap sebagai kotak piksel seukuran body langsung ke buffer layar, dikelompokkan per ukuran
+        points = self.camera.world_to_screen_array(snapshot.positions[rows])
+        sizes = np.clip(np.rint(2 * screen_radii).astype(np.int32), 1, 2 * LOD_POINT_RADIUS)
+        points -= (sizes // 2)[:, None]
+        width, height = screen.get_size()
+        if screen.get_bytesize() != 4: # buffer piksel langsung hanya untuk surface 32-bit
+            for (x, y), size in zip(points.tolist(), sizes.tolist()):
+                screen.fill(BLUE, (x, y, size, size))
+            return
+        pixels = pygame.surfarray.pixels2d(screen)
+        color = screen.map_rgb(BLUE)
+        for size in np.unique(sizes).tolist():
+            group = points[sizes == size]
+            for dx in range(size):
+                for dy in range(size):
+                    x, y = group[:, 0] + dx, group[:, 1] + dy
+                    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+                    pixels[x[inside], y[inside]] = color
+        del pixels # buka kunci surface
+
+    def draw_bodies(self, screen, snapshot, selected_body):
+        self._update_geometry(snapshot)
+        if self.use_heatmap():
+            self.visible_rows = [] # sambungan juga tidak digambar
+            self.draw_heatmap(screen, snapshot)
+            return
+        rows = self.cull(snapshot)
+        if not rows: return
+        camera = self.camera
+        records = snapshot.records
+
+        # Body yang terlalu kecil di layar digambar sebagai titik (kecuali yang dipilih)
+        visible = np.array(rows, dtype=np.intp)
+        screen_radii = self.body_radius[visible] * camera.zoom
+        small = screen_radii < LOD_POINT_RADIUS
+        selected_row = self.body_rows.get(selected_body)
+        if selected_row is not None: small &= visible != selected_row
+        if small.any():
+            self._draw_points(screen, snapshot, visible[small], screen_radii[small])
+            rows = visible[~small].tolist()
+            if not rows: return
+        cache = self._sleeping_cache(snapshot)
+        sleeping = snapshot.sleeping.tolist() if cache is not None else None
+        # Hanya baris tanpa geometri tersimpan yang ditransformasi
+        fresh = rows if not cache else [row for row in rows if not (sleeping[row] and row in cache)]
+        circle_idx = np.array([self.draw_order[row][1] for row in fresh if self.draw_order[row][0]], dtype=np.intp)
+        poly_idx = np.array([self.draw_order[row][1] for row in fresh if not self.draw_order[row][0]], dtype=np.intp)
+
+        # Lingkaran: posisi, jari-jari dan garis rotasi dihitung sekaligus
+        if len(circle_idx):
+            positions = snapshot.positions[self.circle_rows[circle_idx]]
+            angles = snapshot.angles[self.circle_rows[circle_idx]]
+            radii = self.radii[circle_idx]
+            ends = positions + radii[:, None] * np.column_stack((np.cos(angles), np.sin(angles)))
+            centers = camera.world_to_screen_array(positions).tolist()
+            end_points = camera.world_to_screen_array(ends).tolist()
+            screen_radii = (radii * camera.zoom).astype(np.int32).tolist()
+
+        # Kotak & poligon: vertex yang terlihat ditransformasi dalam satu operasi
+        if len(poly_idx):
+            counts = self.vert_counts[poly_idx]
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            vert_idx = np.repeat(self.vert_offsets[poly_idx] - offsets[:-1], counts) + np.arange(offsets[-1])
+            owners = self.poly_rows[np.repeat(poly_idx, counts)]
+            angles = snapshot.angles[owners]
+            cos_a, sin_a = np.cos(angles), np.sin(angles)
+            lx, ly = self.local_verts[vert_idx, 0], self.local_verts[vert_idx, 1]
+            world = snapshot.positions[owners] + np.column_stack((lx * cos_a - ly * sin_a, lx * sin_a + ly * cos_a))
+            screen_verts = camera.world_to_screen_array(world).tolist()
+            offsets = offsets.tolist()
+
+        # Panggilan gambar tetap dalam urutan registri
+        ci = pi = 0
+        for row in rows:
+            body = records[row]['shape'].body
+            color = RED if body == selected_body else BLUE
+            item = cache.get(row) if cache and sleeping[row] else None
+            if item is None:
+                if self.draw_order[row][0]:
+                    item = (centers[ci], screen_radii[ci], end_points[ci])
+                    ci += 1
+                else:
+                    item = screen_verts[offsets[pi]:offsets[pi + 1]]
+                    pi += 1
+                if cache is not None:
+                    if sleeping[row]: cache[row] = item
+                    else: cache.pop(row, None) # body bangun: geometri lama tidak berlaku
+            if self.draw_order[row][0]:
+                center, radius, end_point = item
+                pygame.draw.circle(screen, color, center, radius)
+                # Gambar garis sudut untuk menunjukkan rotasi
+                if radius >= LOD_ROTATION_RADIUS: pygame.draw.line(screen, UI_TEXT, center, end_point, 2)
+            else:
+                pygame.draw.polygon(screen, color, item)
+
+    def _update_joint_geometry(self, snapshot):
+        # Baris body dan anchor lokal per sambungan, dibangun ulang hanya saat registri berubah.
+        # Body di luar snapshot (mis. baru ditambahkan) memakai pose saat ini sebagai baris tambahan
+        key = (snapshot.version, self.engine.registry.version)
+        if self._joint_key == key: return
+        with self.engine.lock:
+            joints = [(record['type'], record['constraint']) for record in self.engine.registry.joints.values()]
+        extra_rows, extra_poses = {}, []
+        def row_of(body):
+            row = self.body_rows.get(body)
+            if row is not None: return row
+            if body not in extra_rows:
+                extra_rows[body] = len(snapshot.records) + len(extra_poses)
+                extra_poses.append((*body.position, body.angle))
+            return extra_rows[body]
+        self.joint_rows = np.array([(row_of(c.a), row_of(c.b)) for _, c in joints], dtype=np.intp).reshape(-1, 2)
+        self.joint_anchors = np.array([(*c.anchor_a, *c.anchor_b) for _, c in joints], dtype=float).reshape(-1, 2, 2)
+        self.joint_is_spring = np.array([joint_type == 'spring' for joint_type, _ in joints], dtype=bool)
+        self.extra_poses = np.array(extra_poses, dtype=float).reshape(-1, 3)
+        self._joint_key = key
+
+    def coil_template(self, segments):
+        # Zigzag satuan: x = posisi sepanjang pegas (0..1), y = sisi (-1/+1), dipakai ulang untuk semua pegas
+        if segments not in self._coil_templates:
+            k = np.arange(segments)
+            self._coil_templates[segments] = np.column_stack(((k + 0.5) / segments, np.where(k % 2, 1.0, -1.0)))
+        return self._coil_templates[segments]
+
+    def draw_joints(self, screen, snapshot):
+        # Hanya sambungan yang menyentuh objek terlihat (hasil cull frame ini); semua ujung dihitung sekaligus
+        if not self.visible_rows or not self.engine.registry.joints: return
+        self._update_joint_geometry(snapshot)
+        n = len(snapshot.records)
+        visible = np.zeros(n + len(self.extra_poses), dtype=bool)
+        visible[self.visible_rows] = True
+        shown = visible[self.joint_rows].any(axis=1)
+        if not shown.any(): return
+        rows, anchors, springs = self.joint_rows[shown], self.joint_anchors[shown], self.joint_is_spring[shown]
+
+        positions = np.concatenate((snapshot.positions, self.extra_poses[:, :2]))[rows]  # (J, 2, 2)
+        angles = np.concatenate((snapshot.angles, self.extra_poses[:, 2]))[rows]         # (J, 2)
+        cos_a, sin_a = np.cos(angles), np.sin(angles)
+        ax, ay = anchors[..., 0], anchors[..., 1]
+        world = positions + np.stack((ax * cos_a - ay * sin_a, ax * sin_a + ay * cos_a), axis=-1)
+        ends = self.camera.world_to_screen_array(world.reshape(-1, 2)).reshape(-1, 2, 2)
+
+        for (a_pos, b_pos), spring in zip(ends.tolist(), springs.tolist()):
+            pygame.draw.line(screen, CYAN_HIGHLIGHT, a_pos, b_pos, 3 if spring else 2)
+
+        # Kumparan: template satuan ditransformasi affine ke setiap pegas, satu draw.lines per pegas
+        if self.coil_segments < 2 or not springs.any(): return
+        a, b = ends[springs, 0].astype(float), ends[springs, 1].astype(float)
+        direction = b - a
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        keep = length > 0
+        a, direction, length = a[keep], direction[keep], length[keep]
+        perp = np.column_stack((-direction[:, 1], direction[:, 0])) / length[:, None] * 5
+        template = self.coil_template(self.coil_segments)
+        coils = a[:, None] + template[None, :, :1] * direction[:, None] + template[None, :, 1:] * perp[:, None]
+        for points in coils.tolist():
+            pygame.draw.lines(screen, CYAN_HIGHLIGHT, False, points, 1)
+
+# --- Cache Teks ---
+TEXT_CACHE_SIZE = 512
+_text_cache = {}
+
+def render_text(font, text, color):
+    # Surface teks di-cache per (font, teks, warna) agar tidak di-render ulang tiap frame
+    key = (font, text, color)
+    surf = _text_cache.get(key)
+    if surf is None:
+        if len(_text_cache) >= TEXT_CACHE_SIZE: _text_cache.clear()
+        surf = _text_cache[key] = font.render(text, True, color)
+    return surf
+
 # --- Kelas UI ---
 class Button:
     def __init__(self, rect, text, font, callback=None):
@@ -65,12 +402,13 @@ class Button:
         self.callback = callback
         self.is_hovered = False
 
-    def draw(self, screen, is_selected=False):
+    def draw(self, screen, is_selected=False, origin=(0, 0)):
+        rect = self.rect.move(-origin[0], -origin[1])
         color = UI_BUTTON_SELECTED if is_selected else (UI_BUTTON_HOVER if self.is_hovered else UI_BUTTON)
-        pygame.draw.rect(screen, color, self.rect, border_radius=5)
-        pygame.draw.rect(screen, UI_BORDER, self.rect, 1, border_radius=5)
-        text_surf = self.font.render(self.text, True, UI_TEXT)
-        screen.blit(text_surf, text_surf.get_rect(center=self.rect.center))
+        pygame.draw.rect(screen, color, rect, border_radius=5)
+        pygame.draw.rect(screen, UI_BORDER, rect, 1, border_radius=5)
+        text_surf = render_text(self.font, self.text, UI_TEXT)
+        screen.blit(text_surf, text_surf.get_rect(center=rect.center))
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
@@ -82,10 +420,11 @@ class Button:
         return False
 
 class Slider:
-    def __init__(self, rect, label, min_val, max_val, initial_val):
+    def __init__(self, rect, label, min_val, max_val, initial_val, integer=False):
         self.rect = pygame.Rect(rect)
         self.label = label
         self.min_val, self.max_val, self.val = min_val, max_val, initial_val
+        self.integer = integer
         self.grabbed = False
 
     def handle_event(self, event):
@@ -97,81 +436,90 @@ class Slider:
             ratio = (event.pos[0] - self.rect.x) / self.rect.width
             self.val = self.min_val + ratio * (self.max_val - self.min_val)
             self.val = max(self.min_val, min(self.max_val, self.val))
+            if self.integer: self.val = round(self.val)
 
-    def draw(self, screen):
-        text_surf = FONT_NORMAL.render(f"{self.label}: {self.val:.2f}", True, UI_TEXT)
-        screen.blit(text_surf, (self.rect.x, self.rect.y - 22))
-        pygame.draw.rect(screen, UI_BORDER, self.rect, border_radius=5)
+    def draw(self, screen, origin=(0, 0)):
+        rect = self.rect.move(-origin[0], -origin[1])
+        val_text = f"{self.val:.0f}" if self.integer else f"{self.val:.2f}"
+        text_surf = render_text(FONT_NORMAL, f"{self.label}: {val_text}", UI_TEXT)
+        screen.blit(text_surf, (rect.x, rect.y - 22))
+        pygame.draw.rect(screen, UI_BORDER, rect, border_radius=5)
         ratio = (self.val - self.min_val) / (self.max_val - self.min_val)
-        fill_width = int(self.rect.width * ratio)
-        pygame.draw.rect(screen, UI_BUTTON_SELECTED, (self.rect.x, self.rect.y, fill_width, self.rect.height), border_radius=5)
-
-# --- Kelas Pengumpul Data & Grafik ---
-class DataCollector:
-    def __init__(self, max_points=200):
-        self.max_points = max_points
-        self.data = {}
-        self.labels = {
-            'pos_x': 'Position X', 'pos_y': 'Position Y',
-            'vel_x': 'Velocity X', 'vel_y': 'Velocity Y', 'vel_mag': 'Speed',
-            'ke': 'Kinetic E', 'pe': 'Potential E', 'total_e': 'Total E'
-        }
-        self.reset()
-
-    def reset(self):
-        for key in self.labels:
-            self.data[key] = deque(maxlen=self.max_points)
-
-    def update(self, body, gravity_y):
-        if body is None or body.mass == 0 or body.body_type != pymunk.Body.DYNAMIC: return
-        pos = body.position
-        vel = body.velocity
-        ke = 0.5 * body.mass * vel.length_squared
-        pe = -body.mass * gravity_y * (pos.y - HEIGHT/2) # PE relatif
-        
-        self.data['pos_x'].append(pos.x)
-        self.data['pos_y'].append(pos.y)
-        self.data['vel_x'].append(vel.x)
-        self.data['vel_y'].append(vel.y)
-        self.data['vel_mag'].append(vel.length)
-        self.data['ke'].append(ke)
-        self.data['pe'].append(pe)
-        self.data['total_e'].append(ke + pe)
-        
-def draw_graph(screen, rect, data_deque, label, color):
-    if not data_deque: return
+        fill_width = int(rect.width * ratio)
+        pygame.draw.rect(screen, UI_BUTTON_SELECTED, (rect.x, rect.y, fill_width, rect.height), border_radius=5)
+
+# --- Grafik ---
+def draw_graph(screen, rect, graph, label, color):
+    if len(graph) == 0: return
     pygame.draw.rect(screen, UI_BG, rect)
     pygame.draw.rect(screen, UI_BORDER, rect, 1)
 
-    max_val = max(data_deque) if data_deque else 1.0
-    min_val = min(data_deque) if data_deque else 0.0
+    min_val, max_val = graph.extrema()
     val_range = max(1e-5, max_val - min_val)
     
-    points = []
-    for i, val in enumerate(data_deque):
-        x = rect.x + (i / (len(data_deque) - 1 if len(data_deque) > 1 else 1)) * rect.width
-        y = rect.bottom - ((val - min_val) / val_range) * rect.height
-        points.append((x, y))
-
-    if len(points) > 1: pygame.draw.lines(screen, color, False, points, 2)
-    label_surf = FONT_NORMAL.render(f"{label}: {data_deque[-1]:.1f}", True, UI_TEXT)
+    # Riwayat panjang diringkas menjadi pasangan min/max per kolom piksel
+    mins, maxs = graph.decimate(rect.width)
+    if len(mins) == len(graph):
+        xs = rect.x + np.arange(len(mins)) / max(1, len(mins) - 1) * rect.width
+        ys = rect.bottom - (mins - min_val) / val_range * rect.height
+        points = np.column_stack((xs, ys))
+    else:
+        xs = np.repeat(rect.x + np.arange(len(mins)), 2)
+        ys = rect.bottom - (np.column_stack((mins, maxs)).ravel() - min_val) / val_range * rect.height
+        points = np.column_stack((xs, ys))
+
+    if len(points) > 1: pygame.draw.lines(screen, color, False, points.tolist(), 2)
+    label_surf = FONT_NORMAL.render(f"{label}: {graph.last:.1f}", True, UI_TEXT)
     screen.blit(label_surf, (rect.x + 5, rect.y + 5))
 
+# --- Jejak Lintasan ---
+def draw_trace(screen, screen_points, color, stride=1):
+    # Polyline 2 px; dengan stride hanya setiap titik ke-N yang digambar (titik terakhir selalu ikut)
+    if stride > 1: screen_points = screen_points[-1::-stride][::-1]
+    if len(screen_points) > 1: pygame.draw.lines(screen, color, False, screen_points.tolist(), 2)
+
+# --- Overlay Profiler ---
+def render_profile(stats):
+    # Tabel p50/p99 per fase (ms) sebagai surface semi-transparan, dibuat ulang tiap PROFILE_OVERLAY_REFRESH frame
+    lines = [("phase", "p50", "p99")] + [(name, f"{p50:.2f}", f"{p99:.2f}") for name, (p50, p99) in stats.items()]
+    row_height = FONT_NORMAL.get_linesize()
+    surf = pygame.Surface((250, row_height * len(lines) + 10), pygame.SRCALPHA)
+    surf.fill((*UI_BG, 210))
+    for row, columns in enumerate(lines):
+        color = RED if columns[0] == 'busy' and stats['busy'][1] > 1000 / FPS else UI_TEXT
+        for x, text in zip((8, 120, 185), columns):
+            surf.blit(FONT_NORMAL.render(text, True, color), (x, 5 + row * row_height)) # angka berubah: tanpa cache
+    return surf
+
+# --- Inisialisasi UI (hanya saat jendela dibuka) ---
+def init_ui():
+    # Hanya display dan font; subsistem lain (audio, joystick) tidak dipakai sandbox
+    global FONT_NORMAL, FONT_TITLE, FONT_HEADER
+    pygame.display.init()
+    pygame.font.init()
+    FONT_NORMAL = pygame.font.Font(None, 24)
+    FONT_TITLE = pygame.font.Font(None, 28)
+    FONT_HEADER = pygame.font.Font(None, 36)
+    _text_cache.clear()
+
 # --- Fungsi Utama ---
 def main():
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    startup = time.perf_counter()
+    init_ui()
+    display = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Physics Sandbox Pro")
     clock = pygame.time.Clock()
     
     # --- State & Variabel ---
-    space = pymunk.Space()
-    space.gravity = (0, -981)
+    engine = SimulationEngine(WORLD_WIDTH, WORLD_HEIGHT, 1 / FPS, threaded=PHYSICS_THREADED, threads=PHYSICS_THREADS)
+    if HISTORY_ENABLED: engine.start_history()
+    physics_worker = PhysicsWorker(engine) if PHYSICS_THREADED else None
+    if physics_worker: physics_worker.start()
+    physics_clock = PhysicsClock(engine.dt)
+    frame_time = 0.0
     
     camera = Camera()
-    
-    # Koleksi Objek
-    objects = []
-    joints = []
+    renderer = WorldRenderer(engine, camera)
     
     # State UI
     simulation_running = True
@@ -181,67 +529,112 @@ def main():
     # State Interaksi
     selected_body = None
     dragged_body = None
-    dragged_joint = None
-    mouse_body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
     
     # State Alat
     polygon_points = []
     joint_tool_body1 = None
+    emitting = False
+    emit_accumulator = 0.0
+    grid_start = None # sudut pertama persegi grid fill (koordinat dunia)
+    rng = np.random.default_rng()
 
     # State Statistik
-    data_collector = DataCollector()
-    path_tracer = deque(maxlen=200)
+    data_collector = engine.data_collector
+    path_tracer = PathTracer() # body terpilih + body yang disematkan
+    traced_bodies = set() # disematkan dengan SHIFT+klik
+    predictor = TrajectoryPredictor()
+    predictor.start()
+    predicting = PREDICT_ENABLED
     current_plot_var = 'ke'
-    next_body_id = 0
-
-    # Tambahkan batas statis
-    static_lines = [
-        pymunk.Segment(space.static_body, (0, 0), (WIDTH, 0), 5),
-        pymunk.Segment(space.static_body, (0, 0), (0, HEIGHT), 5),
-        pymunk.Segment(space.static_body, (WIDTH, 0), (WIDTH, HEIGHT), 5),
-        pymunk.Segment(space.static_body, (0, HEIGHT), (WIDTH, HEIGHT), 5),
-    ]
-    for line in static_lines:
-        line.elasticity = 0.9
-        line.friction = 0.7
-    space.add(*static_lines)
-
+    graph = GraphBuffer()
+    graph_key = None
+    recorder = None
+    capture = None
+    scene_loader = None # pemuatan scene bertahap yang sedang berjalan
+    scene_writer = SceneWriter()
+    scene_writer.start()
+    autosave_timer = 0.0
+    profiler = FrameProfiler()
+    show_profile = False
+    profile_surf = None
+    quality = QualityController(1000 / FPS)
+    graph_surf = pygame.Surface((310, 100))
+    graph_surf_key = None
 
     # --- Fungsi Bantuan ---
-    def get_body_by_id(body_id):
-        for obj in objects:
-            if obj.get('id') == body_id:
-                return obj['shape'].body
-        return None
-
     def remove_object(body_to_remove):
-        nonlocal objects, joints, selected_body
-        
-        # Hapus objek dan bentuknya
-        obj_to_remove = None
-        for obj in objects:
-            if obj['shape'].body == body_to_remove:
-                obj_to_remove = obj
-                break
-        if obj_to_remove:
-            space.remove(obj_to_remove['shape'], obj_to_remove['shape'].body)
-            objects.remove(obj_to_remove)
-            if selected_body == body_to_remove:
-                selected_body = None
-                data_collector.reset()
-                path_tracer.clear()
-
-        # Hapus sambungan yang terhubung
-        joints_to_remove = [j for j in joints if j['constraint'].a == body_to_remove or j['constraint'].b == body_to_remove]
-        for joint in joints_to_remove:
-            space.remove(joint['constraint'])
-            joints.remove(joint)
+        nonlocal selected_body, joint_tool_body1
+        removed = engine.remove_object(body_to_remove)
+        # Body kembali ke pool dan bisa dipakai objek lain; jangan simpan referensinya
+        if joint_tool_body1 == body_to_remove: joint_tool_body1 = None
+        if not removed: return
+        if selected_body == body_to_remove: selected_body = None
+        traced_bodies.discard(body_to_remove)
+        path_tracer.unfollow(body_to_remove)
+
+    def select_body(body):
+        # Jejak body sebelumnya dilepas kecuali disematkan; body baru mulai dengan jejak kosong
+        nonlocal selected_body
+        if selected_body is not None and selected_body != body and selected_body not in traced_bodies:
+            path_tracer.unfollow(selected_body)
+        selected_body = body
+        if body is not None: path_tracer.follow(body)
+
+    def toggle_trace(body):
+        if body in traced_bodies:
+            traced_bodies.discard(body)
+            if body != selected_body: path_tracer.unfollow(body)
+        elif path_tracer.follow(body):
+            traced_bodies.add(body)
+
+    def emit(count, position):
+        # Semburan lingkaran kecil di sekitar kursor dengan kecepatan acak
+        offsets = rng.uniform(-EMITTER_RADIUS, EMITTER_RADIUS, (count, 2))
+        velocities = rng.uniform(-EMITTER_SPEED, EMITTER_SPEED, (count, 2))
+        engine.add_circles(np.asarray(position) + offsets, EMITTER_RADIUS, sliders['density'].val,
+                           sliders['friction'].val, sliders['elasticity'].val, velocities)
+
+    def grid_fill(corner_a, corner_b):
+        # Isi persegi dengan lingkaran berjajar rapat (dibatasi GRID_FILL_MAX)
+        spacing = 2 * GRID_FILL_RADIUS + GRID_FILL_GAP
+        (x0, x1), (y0, y1) = sorted((corner_a[0], corner_b[0])), sorted((corner_a[1], corner_b[1]))
+        xs = np.arange(x0 + GRID_FILL_RADIUS, x1 - GRID_FILL_RADIUS + 1, spacing)
+        ys = np.arange(y0 + GRID_FILL_RADIUS, y1 - GRID_FILL_RADIUS + 1, spacing)
+        points = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)[:GRID_FILL_MAX]
+        if len(points):
+            engine.add_circles(points, GRID_FILL_RADIUS, sliders['density'].val,
+                               sliders['friction'].val, sliders['elasticity'].val)
+            print(f"Grid filled with {len(points)} circles")
+
+    def sync_graph():
+        # Isi ulang buffer grafik dari riwayat telemetri saat objek/variabel plot berganti
+        nonlocal graph_key
+        key = (selected_body, current_plot_var)
+        if key == graph_key: return
+        graph.reset()
+        graph.extend(data_collector.series(selected_body, current_plot_var))
+        graph_key = key
+
+    def sample_step():
+        # Data satu langkah fisika; di mode multi-core dipanggil dari thread fisika
+        sample = data_collector.latest_sample() if recorder else None
+        trace = path_tracer.sample() if len(path_tracer) else None
+        return engine.step_count, engine.sim_time, sample, data_collector.latest(selected_body, current_plot_var), trace
+
+    def apply_step(step, sim_time, sample, value, trace):
+        if recorder and sample is not None:
+            recorder.push(step, sim_time, *sample)
+        if value is not None: graph.append(value)
+        if trace is not None: path_tracer.append(trace)
 
     def set_current_tool(tool_name):
-        nonlocal current_tool, polygon_points, joint_tool_body1
+        nonlocal current_tool, polygon_points, joint_tool_body1, emitting, grid_start
         current_tool = tool_name
         polygon_points = []
         joint_tool_body1 = None
+        emitting, grid_start = False, None
+        if tool_name in ("EMITTER", "GRID_FILL"):
+            engine.pool.reserve(('circle', EMITTER_RADIUS), POOL_RESERVE)
         print(f"Tool changed to: {tool_name}")
 
     def set_current_tab(tab_name):
@@ -257,8 +650,8 @@ def main():
             print("No object selected to export data.")
             return
         filename = f"stats_export_{int(time.time())}.csv"
-        header = list(data_collector.data.keys())
-        rows = zip(*[data_collector.data[key] for key in header])
+        header = data_collector.body_keys()
+        rows = zip(*[data_collector.series(selected_body, key).tolist() for key in header])
         
         with open(filename, 'w', newline='') as f:
             writer = csv.writer(f)
@@ -266,14 +659,51 @@ def main():
             writer.writerows(rows)
         print(f"Data exported to {filename}")
 
+    def toggle_recording():
+        nonlocal recorder
+        if recorder:
+            recorder.stop(wait=False)
+            recorder = None
+            record_button.text = "Record"
+        else:
+            path = f"telemetry_{int(time.time())}" + ('.csv' if RECORD_FORMAT == 'csv' else '')
+            recorder = TelemetryRecorder(path, RECORD_FORMAT)
+            recorder.start()
+            record_button.text = "Stop Rec"
+
+    def toggle_capture():
+        nonlocal capture
+        if capture:
+            capture.stop(wait=False)
+            capture = None
+            return
+        path = f"capture_{int(time.time())}" + ('.mp4' if CAPTURE_FORMAT == 'video' else '')
+        new_capture = FrameCapture(path, (WIDTH, HEIGHT), CAPTURE_FORMAT, FPS, CAPTURE_QUEUE_SIZE, CAPTURE_DROP_POLICY)
+        try:
+            new_capture.start()
+            capture = new_capture
+        except OSError as e:
+            print(f"Error starting capture: {e}")
 
     # --- UI Elements ---
     sliders = {
-        'density': Slider(pygame.Rect(UI_PANEL_X + 20, 280, UI_PANEL_WIDTH - 40, 10), "Density", 0.1, 5.0, 1.0),
-        'friction': Slider(pygame.Rect(UI_PANEL_X + 20, 330, UI_PANEL_WIDTH - 40, 10), "Friction", 0.0, 2.0, 0.7),
-        'elasticity': Slider(pygame.Rect(UI_PANEL_X + 20, 380, UI_PANEL_WIDTH - 40, 10), "Elasticity", 0.0, 1.5, 0.8),
-        'gravity_y': Slider(pygame.Rect(UI_PANEL_X + 20, 100, UI_PANEL_WIDTH - 40, 10), "Gravity Y", -2000, 2000, -981),
-        'damping': Slider(pygame.Rect(UI_PANEL_X + 20, 150, UI_PANEL_WIDTH - 40, 10), "Air Damping", 0.9, 1.0, 0.998)
+        'density': Slider(pygame.Rect(UI_PANEL_X + 20, 280, UI_PANEL_WIDTH - 40, 10), "Density", *PARAMETER_RANGES['density']),
+        'friction': Slider(pygame.Rect(UI_PANEL_X + 20, 330, UI_PANEL_WIDTH - 40, 10), "Friction", *PARAMETER_RANGES['friction']),
+        'elasticity': Slider(pygame.Rect(UI_PANEL_X + 20, 380, UI_PANEL_WIDTH - 40, 10), "Elasticity", *PARAMETER_RANGES['elasticity']),
+        'emit_rate': Slider(pygame.Rect(UI_PANEL_X + 20, 430, UI_PANEL_WIDTH - 40, 10), "Emit Rate /s", 50, 5000, EMITTER_RATE, integer=True),
+        'gravity_y': Slider(pygame.Rect(UI_PANEL_X + 20, 100, UI_PANEL_WIDTH - 40, 10), "Gravity Y", *PARAMETER_RANGES['gravity_y']),
+        'damping': Slider(pygame.Rect(UI_PANEL_X + 20, 150, UI_PANEL_WIDTH - 40, 10), "Air Damping", *PARAMETER_RANGES['damping']),
+        'physics_hz': Slider(pygame.Rect(UI_PANEL_X + 20, 200, UI_PANEL_WIDTH - 40, 10), "Physics Hz", 30, 240, FPS, integer=True),
+        'substeps': Slider(pygame.Rect(UI_PANEL_X + 20, 250, UI_PANEL_WIDTH - 40, 10), "Substeps", 1, 8, engine.substeps, integer=True),
+        'sleep_time': Slider(pygame.Rect(UI_PANEL_X + 20, 300, UI_PANEL_WIDTH - 40, 10), "Sleep After (s, 0 = off)", 0, 5, engine.sleep_time),
+        'idle_speed': Slider(pygame.Rect(UI_PANEL_X + 20, 350, UI_PANEL_WIDTH - 40, 10), "Idle Speed (0 = auto)", 0, 100, engine.idle_speed)
+    }
+
+    # Slider yang aktif per tab
+    tab_sliders = {
+        "Tools": ['density', 'friction', 'elasticity', 'emit_rate'],
+        "World": ['gravity_y', 'damping', 'physics_hz', 'substeps', 'sleep_time', 'idle_speed'],
+        "Statistics": []
     }
 
     # Tombol Tab
@@ -284,7 +714,7 @@ def main():
     ]
     
     # Tombol Alat
-    tool_names = ["SELECT", "CIRCLE", "BOX", "POLYGON", "PIN_JOINT", "SPRING", "ERASER"]
+    tool_names = ["SELECT", "CIRCLE", "BOX", "POLYGON", "PIN_JOINT", "SPRING", "ERASER", "EMITTER", "GRID_FILL"]
     tool_buttons = []
     for i, name in enumerate(tool_names):
         rect = pygame.Rect(UI_PANEL_X + 20 + (i % 3) * 105, 100 + (i // 3) * 50, 100, 40)
@@ -299,161 +729,148 @@ def main():
     
     # Tombol Statistik
     plot_vars = list(data_collector.labels.keys())
-    stat_buttons = [Button(pygame.Rect(UI_PANEL_X + 20, HEIGHT - 60, 310, 40), "Export CSV", FONT_NORMAL, export_csv)]
+    stat_buttons = [Button(pygame.Rect(UI_PANEL_X + 20, HEIGHT - 60, 150, 40), "Export CSV", FONT_NORMAL, export_csv)]
+    record_button = Button(pygame.Rect(UI_PANEL_X + 180, HEIGHT - 60, 150, 40), "Record", FONT_NORMAL, toggle_recording)
     for i, var in enumerate(plot_vars):
         rect = pygame.Rect(UI_PANEL_X + 20 + (i % 4) * 80, 250 + (i//4)*40, 75, 35)
         stat_buttons.append(Button(rect, data_collector.labels[var], FONT_NORMAL, lambda v=var: set_plot_var(v)))
 
-    all_ui_elements = tab_buttons + tool_buttons + scene_buttons + stat_buttons
+    all_ui_elements = tab_buttons + tool_buttons + scene_buttons + stat_buttons + [record_button]
     
+    def seek_history(step):
+        # Hanya saat jeda; body bisa dibuat ulang oleh seek, jadi seleksi dipetakan lewat id
+        nonlocal selected_body, joint_tool_body1
+        selected_id = engine.registry.id_of(selected_body) if selected_body else None
+        traced_ids = [engine.registry.id_of(body) for body in traced_bodies]
+        engine.seek(step)
+        if not dragged_body: engine.end_drag() # seret yang terekam tidak sedang dipegang pengguna
+        selected_body = engine.get_body_by_id(selected_id) if selected_id is not None else None
+        joint_tool_body1 = None
+        traced_bodies.clear()
+        traced_bodies.update(body for body in map(engine.get_body_by_id, traced_ids) if body is not None)
+        path_tracer.clear()
+        for body in traced_bodies | ({selected_body} if selected_body else set()): path_tracer.follow(body)
+        physics_clock.reset()
+
     def clear_scene():
-        nonlocal selected_body, dragged_body, dragged_joint, joint_tool_body1, next_body_id
-        selected_body = dragged_body = dragged_joint = joint_tool_body1 = None
+        nonlocal selected_body, dragged_body, joint_tool_body1, scene_loader, grid_start
+        selected_body = dragged_body = joint_tool_body1 = scene_loader = grid_start = None
         polygon_points.clear()
         
-        for j in list(space.constraints): space.remove(j)
-        for s in list(space.shapes):
-            if s.body.body_type == pymunk.Body.DYNAMIC:
-                space.remove(s, s.body)
-
-        objects.clear()
-        joints.clear()
-        data_collector.reset()
+        engine.clear()
         path_tracer.clear()
-        next_body_id = 0
+        traced_bodies.clear()
         print("Scene cleared.")
 
-    def save_scene(filename="scene.json"):
-        nonlocal next_body_id
-        scene_data = {
-            'next_body_id': next_body_id,
+    def save_scene(filename=None, name="scene"):
+        # Snapshot diambil di sini; encoding dan penulisan file di thread scene_writer
+        if filename is None:
+            # Scene besar disimpan dalam format biner
+            filename = name + (".npz" if len(engine.registry) > BINARY_SCENE_THRESHOLD else ".json")
+        engine.save_scene(filename, extra={
             'camera': {'offset_x': camera.offset.x, 'offset_y': camera.offset.y, 'zoom': camera.zoom},
-            'world': {'gravity_y': sliders['gravity_y'].val, 'damping': sliders['damping'].val},
-            'objects': [],
-            'joints': []
-        }
-        for obj in objects:
-            body = obj['shape'].body
-            obj_data = {
-                'id': obj['id'],
-                'type': obj['type'],
-                'pos': (body.position.x, body.position.y),
-                'angle': body.angle,
-                'vel': (body.velocity.x, body.velocity.y),
-                'ang_vel': body.angular_velocity,
-                'friction': obj['shape'].friction,
-                'elasticity': obj['shape'].elasticity
-            }
-            if obj['type'] == 'circle':
-                obj_data['radius'] = obj['shape'].radius
-                obj_data['mass'] = body.mass
-            elif obj['type'] == 'box':
-                obj_data['size'] = obj['size']
-                obj_data['mass'] = body.mass
-            elif obj['type'] == 'polygon':
-                obj_data['vertices'] = obj['vertices']
-                obj_data['mass'] = body.mass
-            scene_data['objects'].append(obj_data)
-        
-        for joint in joints:
-            c = joint['constraint']
-            joint_data = {
-                'type': joint['type'],
-                'body_a_id': getattr(c.a, '_id', None),
-                'body_b_id': getattr(c.b, '_id', None),
-                'anchor_a': c.anchor_a,
-                'anchor_b': c.anchor_b,
-            }
-            if joint['type'] == 'spring':
-                joint_data['rest_length'] = c.rest_length
-                joint_data['stiffness'] = c.stiffness
-                joint_data['damping'] = c.damping
-            scene_data['joints'].append(joint_data)
-
-        with open(filename, 'w') as f:
-            json.dump(scene_data, f, indent=2)
-        print(f"Scene saved to {filename}")
-
-    def load_scene(filename="scene.json"):
-        nonlocal next_body_id
+            'world': {'gravity_y': sliders['gravity_y'].val, 'damping': sliders['damping'].val,
+                      'sleep_time': sliders['sleep_time'].val, 'idle_speed': sliders['idle_speed'].val},
+        }, writer=scene_writer)
+
+    def load_scene(filename=None):
+        nonlocal scene_loader
+        scene_writer.flush() # jangan membaca file yang masih ditulis
+        if filename is None:
+            # Muat file scene yang paling baru disimpan
+            candidates = [f for f in ("scene.json", "scene.npz") if os.path.exists(f)]
+            filename = max(candidates, key=os.path.getmtime) if candidates else "scene.json"
         clear_scene()
-        try:
-            with open(filename, 'r') as f:
-                scene_data = json.load(f)
+        scene_loader = engine.open_scene(filename)
+        if scene_loader is None: return
+
+        cam_data = scene_loader.meta.get('camera', {})
+        camera.offset.x = cam_data.get('offset_x', 0)
+        camera.offset.y = cam_data.get('offset_y', 0)
+        camera.zoom = cam_data.get('zoom', 1.0)
+
+        world_data = scene_loader.meta.get('world', {})
+        sliders['gravity_y'].val = world_data.get('gravity_y', -981)
+        sliders['damping'].val = world_data.get('damping', 0.998)
+        sliders['sleep_time'].val = engine.sleep_time
+        sliders['idle_speed'].val = engine.idle_speed
+
+    def draw_panel(surface, origin):
+        surface.fill(UI_BG)
+        pygame.draw.line(surface, UI_BORDER, (0, 0), (0, HEIGHT), 2)
+        
+        # Gambar Tombol Tab
+        for btn in tab_buttons: btn.draw(surface, is_selected=(current_tab == btn.text), origin=origin)
+        y_cursor = 70
+        
+        # Gambar Konten Tab
+        if current_tab == "Tools":
+            surface.blit(render_text(FONT_TITLE, "Tools", UI_TEXT), (20, y_cursor))
+            y_cursor += 30
+            for btn in tool_buttons: btn.draw(surface, is_selected=(current_tool == btn.text), origin=origin)
             
-            next_body_id = scene_data.get('next_body_id', 0)
-            cam_data = scene_data.get('camera', {})
-            camera.offset.x = cam_data.get('offset_x', 0)
-            camera.offset.y = cam_data.get('offset_y', 0)
-            camera.zoom = cam_data.get('zoom', 1.0)
-
-            world_data = scene_data.get('world', {})
-            sliders['gravity_y'].val = world_data.get('gravity_y', -981)
-            sliders['damping'].val = world_data.get('damping', 0.998)
+            y_cursor = max(btn.rect.bottom for btn in tool_buttons) + 20
+            surface.blit(render_text(FONT_TITLE, "Object Properties", UI_TEXT), (20, y_cursor))
+            y_cursor += 40
+            for key in tab_sliders["Tools"]:
+                sliders[key].rect.y = y_cursor; sliders[key].draw(surface, origin); y_cursor += 50
+        elif current_tab == "World":
+            surface.blit(render_text(FONT_TITLE, "World Properties", UI_TEXT), (20, y_cursor))
+            y_cursor += 40
+            for key in tab_sliders["World"]:
+                sliders[key].rect.y = y_cursor; sliders[key].draw(surface, origin); y_cursor += 50
+
+            mode = "auto" if QUALITY_ADAPTIVE else "fixed"
+            title = f"Quality: level {quality.level}/{len(quality.levels) - 1} ({mode})"
+            y_cursor -= 20 # y_cursor menunjuk ke slider berikutnya, labelnya 22 px di atas
+            surface.blit(render_text(FONT_TITLE, title, UI_TEXT), (20, y_cursor))
+            y_cursor += 30
+            for key, value in quality.settings.items():
+                surface.blit(render_text(FONT_NORMAL, f"{QUALITY_LABELS[key]}: {value}", UI_TEXT), (20, y_cursor))
+                y_cursor += 24
+        elif current_tab == "Statistics":
+            surface.blit(render_text(FONT_TITLE, "Statistics", UI_TEXT), (20, y_cursor))
+            y_cursor += 40
             
-            created_bodies = {}
-            for obj_data in scene_data.get('objects', []):
-                pos = tuple(obj_data['pos'])
-                mass = obj_data.get('mass', 1)
-                body = None
-
-                if obj_data['type'] == 'circle':
-                    radius = obj_data['radius']
-                    moment = pymunk.moment_for_circle(mass, 0, radius)
-                    body = pymunk.Body(mass, moment)
-                    shape = pymunk.Circle(body, radius)
-                    objects.append({'id': obj_data['id'], 'type': 'circle', 'shape': shape})
-                elif obj_data['type'] == 'box':
-                    size = tuple(obj_data['size'])
-                    moment = pymunk.moment_for_box(mass, size)
-                    body = pymunk.Body(mass, moment)
-                    shape = pymunk.Poly.create_box(body, size)
-                    objects.append({'id': obj_data['id'], 'type': 'box', 'size': size, 'shape': shape})
-                elif obj_data['type'] == 'polygon':
-                    vertices = [tuple(v) for v in obj_data['vertices']]
-                    moment = pymunk.moment_for_poly(mass, vertices)
-                    body = pymunk.Body(mass, moment)
-                    shape = pymunk.Poly(body, vertices)
-                    objects.append({'id': obj_data['id'], 'type': 'polygon', 'vertices': vertices, 'shape': shape})
-                
-                if body and shape:
-                    body.position = pos
-                    body.angle = obj_data['angle']
-                    body.velocity = tuple(obj_data['vel'])
-                    body.angular_velocity = obj_data['ang_vel']
-                    shape.friction = obj_data['friction']
-                    shape.elasticity = obj_data['elasticity']
-                    body._id = obj_data['id']
-                    created_bodies[body._id] = body
-                    space.add(body, shape)
-
-            for joint_data in scene_data.get('joints', []):
-                body_a = created_bodies.get(joint_data['body_a_id'])
-                body_b = created_bodies.get(joint_data['body_b_id'])
-                if not body_a or not body_b: continue
-                
-                constraint = None
-                if joint_data['type'] == 'pin':
-                    constraint = pymunk.PinJoint(body_a, body_b, tuple(joint_data['anchor_a']), tuple(joint_data['anchor_b']))
-                elif joint_data['type'] == 'spring':
-                    constraint = pymunk.DampedSpring(body_a, body_b, tuple(joint_data['anchor_a']), tuple(joint_data['anchor_b']), 
-                                                     joint_data['rest_length'], joint_data['stiffness'], joint_data['damping'])
-
-                if constraint:
-                    joints.append({'type': joint_data['type'], 'constraint': constraint})
-                    space.add(constraint)
-
-            print(f"Scene loaded from {filename}")
-        except FileNotFoundError:
-            print(f"Error: {filename} not found.")
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Error reading scene file: {e}")
+            if not selected_body and not current_plot_var.startswith('sys_'):
+                surface.blit(render_text(FONT_NORMAL, "Select a dynamic object to see stats.", UI_TEXT), (20, y_cursor + 40))
+            y_cursor += 110 # Ruang untuk grafik
+            surface.blit(render_text(FONT_NORMAL, "Plot Variable:", UI_TEXT), (20, y_cursor))
+            y_cursor += 30
+            
+            for btn in stat_buttons:
+                if btn.callback == export_csv: continue # Lewati tombol export
+                is_selected = (current_plot_var == next(k for k,v in data_collector.labels.items() if v == btn.text))
+                btn.draw(surface, is_selected, origin)
+            if data_collector.points < data_collector.max_points:
+                # Scene besar: riwayat per objek dipersingkat agar muat di anggaran memori
+                notice = f"History: last {data_collector.points} steps (memory limit)"
+                y_notice = max(btn.rect.bottom for btn in stat_buttons if btn.callback != export_csv) + 10
+                surface.blit(render_text(FONT_NORMAL, notice, UI_TEXT), (20, y_notice))
+
+        # Gambar Tombol Scene (selalu terlihat)
+        for btn in scene_buttons: btn.draw(surface, origin=origin)
+        # Gambar Tombol Statistik (selalu terlihat)
+        for btn in stat_buttons:
+             if btn.callback == export_csv:
+                btn.draw(surface, origin=origin)
+        record_button.draw(surface, is_selected=recorder is not None, origin=origin)
 
     # --- Loop Utama ---
+    panel_cache = {} # tab -> (state, surface)
     running = True
     panning = False
     
     while running:
+        profiler.begin_frame()
+        if QUALITY_ADAPTIVE and not scene_loader: quality.update(profiler.last_busy())
+        quality_settings = quality.settings
+        ui_refresh = profiler.frame_count % quality_settings['ui_interval'] == 0
+        if physics_worker:
+            # Selesaikan batch fisika frame sebelumnya sebelum event boleh mengubah space
+            for result in physics_worker.wait(): apply_step(*result)
+            profiler.lap('physics')
+
         mouse_pos = pygame.mouse.get_pos()
         world_mouse_pos = camera.screen_to_world(mouse_pos)
         
@@ -463,6 +880,29 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+
+            # Jeda & gulir riwayat
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    simulation_running = not simulation_running
+                    physics_clock.reset()
+                elif event.key == pygame.K_F2:
+                    renderer.heatmap_mode = HEATMAP_MODES[(HEATMAP_MODES.index(renderer.heatmap_mode) + 1) % len(HEATMAP_MODES)]
+                    print(f"Density heatmap: {renderer.heatmap_mode}")
+                elif event.key == pygame.K_F3:
+                    show_profile = not show_profile
+                    profile_surf = None
+                elif event.key == pygame.K_p:
+                    predicting = not predicting
+                    if not predicting: predictor.cancel()
+                    print(f"Trajectory prediction: {'on' if predicting else 'off'}")
+                elif event.key == pygame.K_F5:
+                    toggle_capture()
+                elif event.key == pygame.K_F4:
+                    profiler.write_trace(f"profile_{int(time.time())}.json")
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT) and engine.history and not simulation_running:
+                    amount = FPS if event.mod & pygame.KMOD_SHIFT else 1
+                    seek_history(engine.step_count + (amount if event.key == pygame.K_RIGHT else -amount))
             
             # Panning dengan tombol tengah mouse
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 2 and not is_mouse_on_ui: panning = True
@@ -478,58 +918,44 @@ def main():
             # Event UI
             if is_mouse_on_ui:
                 for elem in all_ui_elements: elem.handle_event(event)
-                for s in sliders.values(): s.handle_event(event)
+                for key in tab_sliders[current_tab]: sliders[key].handle_event(event)
             # Event Dunia
             else: 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1: # Klik Kiri
-                        hit = space.point_query_nearest(world_mouse_pos, 0, pymunk.ShapeFilter())
+                        hit = engine.space.point_query_nearest(world_mouse_pos, 0, pymunk.ShapeFilter())
                         
                         if current_tool == "SELECT":
                             if hit and hit.shape.body.body_type == pymunk.Body.DYNAMIC:
                                 body = hit.shape.body
-                                if selected_body != body:
-                                    data_collector.reset()
-                                    path_tracer.clear()
-                                selected_body = body
-                                dragged_body = body
-                                dragged_joint = pymunk.PivotJoint(mouse_body, dragged_body, world_mouse_pos)
-                                dragged_joint.max_force = 50000 * body.mass
-                                space.add(dragged_joint)
+                                if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                                    toggle_trace(body) # bandingkan lintasan banyak body
+                                else:
+                                    select_body(body)
+                                    dragged_body = body
+                                    engine.start_drag(body, world_mouse_pos)
                         
                         elif current_tool == "ERASER":
                              if hit and hit.shape.body.body_type == pymunk.Body.DYNAMIC:
                                 remove_object(hit.shape.body)
                         
                         elif current_tool == "CIRCLE":
-                            radius = 40
-                            mass = sliders['density'].val * math.pi * radius**2 / 1000
-                            moment = pymunk.moment_for_circle(mass, 0, radius)
-                            body = pymunk.Body(mass, moment)
-                            body.position = world_mouse_pos
-                            shape = pymunk.Circle(body, radius)
-                            shape.friction = sliders['friction'].val
-                            shape.elasticity = sliders['elasticity'].val
-                            body._id = next_body_id; next_body_id += 1
-                            space.add(body, shape)
-                            objects.append({'id': body._id, 'type': 'circle', 'shape': shape})
+                            engine.add_circle(world_mouse_pos, 40, sliders['density'].val,
+                                              sliders['friction'].val, sliders['elasticity'].val)
 
                         elif current_tool == "BOX":
-                            size = (80, 80)
-                            mass = sliders['density'].val * size[0] * size[1] / 1000
-                            moment = pymunk.moment_for_box(mass, size)
-                            body = pymunk.Body(mass, moment)
-                            body.position = world_mouse_pos
-                            shape = pymunk.Poly.create_box(body, size)
-                            shape.friction = sliders['friction'].val
-                            shape.elasticity = sliders['elasticity'].val
-                            body._id = next_body_id; next_body_id += 1
-                            space.add(body, shape)
-                            objects.append({'id': body._id, 'type': 'box', 'size': size, 'shape': shape})
+                            engine.add_box(world_mouse_pos, (80, 80), sliders['density'].val,
+                                           sliders['friction'].val, sliders['elasticity'].val)
 
                         elif current_tool == "POLYGON":
                             polygon_points.append(world_mouse_pos)
 
+                        elif current_tool == "EMITTER":
+                            emitting = True
+
+                        elif current_tool == "GRID_FILL":
+                            grid_start = world_mouse_pos
+
                         elif current_tool in ["PIN_JOINT", "SPRING"]:
                             if hit and hit.shape.body.body_type == pymunk.Body.DYNAMIC:
                                 if not joint_tool_body1:
@@ -540,34 +966,14 @@ def main():
                                     if body_a != body_b:
                                         anchor_a = body_a.world_to_local(body_a.position)
                                         anchor_b = body_b.world_to_local(world_mouse_pos)
-                                        
-                                        constraint = None
-                                        if current_tool == "PIN_JOINT":
-                                            constraint = pymunk.PinJoint(body_a, body_b, anchor_a, anchor_b)
-                                            joints.append({'type': 'pin', 'constraint': constraint})
-                                        elif current_tool == "SPRING":
-                                            rest_length = body_a.position.get_distance(body_b.position)
-                                            constraint = pymunk.DampedSpring(body_a, body_b, anchor_a, anchor_b, rest_length, 2000, 30)
-                                            joints.append({'type': 'spring', 'constraint': constraint})
-                                        
-                                        if constraint:
-                                            space.add(constraint)
+                                        joint_type = 'pin' if current_tool == "PIN_JOINT" else 'spring'
+                                        engine.add_joint(joint_type, body_a, body_b, anchor_a, anchor_b)
                                     joint_tool_body1 = None # Reset alat
                             
                     if event.button == 3: # Klik Kanan
                         if current_tool == "POLYGON" and len(polygon_points) > 2:
-                            mass = sliders['density'].val * 10
-                            moment = pymunk.moment_for_poly(mass, polygon_points, (0,0))
-                            body = pymunk.Body(mass, moment)
-                            body.position = pymunk.vec2d.Vec2d(*pymunk.util.calc_center_of_gravity(polygon_points))
-                            
-                            local_verts = [body.world_to_local(p) for p in polygon_points]
-                            shape = pymunk.Poly(body, local_verts)
-                            shape.friction = sliders['friction'].val
-                            shape.elasticity = sliders['elasticity'].val
-                            body._id = next_body_id; next_body_id += 1
-                            space.add(body, shape)
-                            objects.append({'id': body._id, 'type': 'polygon', 'vertices': local_verts, 'shape': shape})
+                            engine.add_polygon(polygon_points, sliders['density'].val,
+                                               sliders['friction'].val, sliders['elasticity'].val)
                             polygon_points.clear()
                         elif current_tool in ["PIN_JOINT", "SPRING", "POLYGON"]:
                             # Batalkan aksi
@@ -576,68 +982,112 @@ def main():
 
                 if event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1: # Lepas Klik Kiri
-                        if dragged_joint:
-                            space.remove(dragged_joint)
-                            dragged_joint = None
+                        if dragged_body:
+                            engine.end_drag()
                             dragged_body = None
+                        if grid_start is not None:
+                            grid_fill(grid_start, world_mouse_pos)
                 
                 if event.type == pygame.MOUSEMOTION:
-                    mouse_body.position = world_mouse_pos
-        
-        # --- Update Fisika ---
-        if simulation_running:
-            space.gravity = (0, sliders['gravity_y'].val)
-            space.damping = sliders['damping'].val
-            space.step(1 / FPS)
+                    engine.move_drag(world_mouse_pos)
+
+            # Lepas tombol di mana pun (juga di atas panel) menghentikan emitter / grid fill
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                emitting, grid_start = False, None
         
-        # --- Update Data ---
-        if selected_body and simulation_running:
-            data_collector.update(selected_body, space.gravity.y)
-            path_tracer.append(selected_body.position)
+        # --- Emitter (laju tetap per detik, sisa pecahan dibawa ke frame berikutnya) ---
+        if emitting and not scene_loader:
+            # Waktu dibatasi seperti jam fisika: frame lambat tidak menumpuk ribuan lingkaran di satu titik (spiral kematian)
+            emit_accumulator += min(frame_time, physics_clock.max_steps * physics_clock.dt) * sliders['emit_rate'].val
+            count = int(emit_accumulator)
+            if count:
+                emit_accumulator -= count
+                emit(count, world_mouse_pos)
+
+        # --- Simpan Otomatis ---
+        if AUTOSAVE_INTERVAL > 0 and not scene_loader:
+            autosave_timer += frame_time
+            if autosave_timer >= AUTOSAVE_INTERVAL:
+                autosave_timer = 0.0
+                # Lewati jika simpanan sebelumnya belum selesai ditulis
+                if not scene_writer.busy: save_scene(name=AUTOSAVE_NAME)
+
+        # --- Prediksi Lintasan (fork ke thread prediksi hanya saat scene diedit) ---
+        if predicting and not scene_loader: predictor.update(engine, dragged_body or selected_body)
+        profiler.lap('events')
+
+        # --- Update Fisika (timestep tetap, terlepas dari laju render) ---
+        # Telemetri semua objek hanya dikumpulkan selama grafik terlihat atau rekaman berjalan
+        telemetry = current_tab == "Statistics" or recorder is not None
+        if telemetry != data_collector.enabled:
+            engine.set_telemetry(telemetry)
+            graph_key = None
+        sync_graph()
+        profiler.lap('telemetry')
+        if scene_loader:
+            # Tambahkan satu chunk per frame; fisika ditahan sampai scene lengkap
+            if scene_loader.step():
+                scene_loader = None
+            physics_clock.reset()
+            profiler.lap('physics')
+        elif simulation_running:
+            engine.set_world(sliders['gravity_y'].val, sliders['damping'].val)
+            engine.set_sleeping(sliders['sleep_time'].val, sliders['idle_speed'].val)
+            physics_clock.dt = engine.dt = 1 / sliders['physics_hz'].val
+            engine.substeps = min(sliders['substeps'].val, quality_settings['max_substeps'])
+            engine.iterations = quality_settings['iterations']
+            steps = physics_clock.advance(frame_time)
+            if physics_worker:
+                # Langkah berjalan di thread fisika selama frame ini digambar dari snapshot sebelumnya
+                physics_worker.submit(steps, sample_step)
+                profiler.lap('physics')
+            else:
+                for i in range(steps):
+                    if i == steps - 1: engine.store_prev_poses()
+                    engine.step()
+                    profiler.lap('physics')
+                    
+                    # --- Update Data ---
+                    engine.record_data()
+                    apply_step(*sample_step())
+                    profiler.lap('telemetry')
+        alpha = physics_clock.alpha if simulation_running and not scene_loader else 1.0
 
         # --- Gambar ---
+        # Saat menangkap, frame digambar langsung ke surface dari pool capture lalu disalin ke jendela
+        frame_surface = capture.acquire() if capture else None
+        screen = frame_surface or display
         screen.fill(COLOR_BG)
         
         # Gambar Objek Fisika
-        for obj in objects:
-            body = obj['shape'].body
-            color = RED if body == selected_body else BLUE
-            
-            if obj['type'] == 'circle':
-                screen_pos = camera.world_to_screen(body.position)
-                screen_radius = int(obj['shape'].radius * camera.zoom)
-                if screen_pos[0] > -screen_radius and screen_pos[0] < WIDTH + screen_radius and \
-                   screen_pos[1] > -screen_radius and screen_pos[1] < HEIGHT + screen_radius:
-                    pygame.draw.circle(screen, color, screen_pos, screen_radius)
-                    # Gambar garis sudut untuk menunjukkan rotasi
-                    end_pos_local = pymunk.Vec2d(obj['shape'].radius, 0).rotated(body.angle)
-                    end_pos_world = body.position + end_pos_local
-                    end_pos_screen = camera.world_to_screen(end_pos_world)
-                    pygame.draw.line(screen, UI_TEXT, screen_pos, end_pos_screen, 2)
-
-            elif obj['type'] in ['box', 'polygon']:
-                verts = [camera.world_to_screen(body.local_to_world(v)) for v in obj['shape'].get_vertices()]
-                pygame.draw.polygon(screen, color, verts)
+        if physics_worker and simulation_running and not scene_loader:
+            snapshot = physics_worker.interpolated_snapshot(alpha)
+        else:
+            snapshot = engine.interpolated_snapshot(alpha)
+        renderer.draw_bodies(screen, snapshot, selected_body)
+        profiler.lap('world')
         
         # Gambar Sambungan
-        for joint in joints:
-            c = joint['constraint']
-            a_pos = camera.world_to_screen(c.a.local_to_world(c.anchor_a))
-            b_pos = camera.world_to_screen(c.b.local_to_world(c.anchor_b))
-            pygame.draw.line(screen, CYAN_HIGHLIGHT, a_pos, b_pos, 2 if joint['type'] == 'pin' else 3)
-            if joint['type'] == 'spring': # Gambar kumparan
-                dir_vec = (pygame.math.Vector2(b_pos) - pygame.math.Vector2(a_pos))
-                if dir_vec.length() > 0:
-                    perp_vec = dir_vec.rotate(90).normalize() * 5
-                    for i in range(1, 10):
-                        point1 = pygame.math.Vector2(a_pos).lerp(b_pos, (i - 0.5) / 10) + perp_vec * (1 if i % 2 == 0 else -1)
-                        point2 = pygame.math.Vector2(a_pos).lerp(b_pos, (i + 0.5) / 10) + perp_vec * (-1 if i % 2 == 0 else 1)
-                        pygame.draw.line(screen, CYAN_HIGHLIGHT, point1, point2, 1)
+        renderer.coil_segments = quality_settings['coil_segments']
+        renderer.draw_joints(screen, snapshot)
+        profiler.lap('joints')
 
         # Gambar Jejak Lintasan
-        if len(path_tracer) > 1:
-            screen_points = [camera.world_to_screen(p) for p in path_tracer]
-            pygame.draw.lines(screen, GREEN, False, screen_points, 2)
+        if len(path_tracer):
+            stride = quality_settings['tracer_stride']
+            traces = path_tracer.screen_traces((camera.offset.x, camera.offset.y, camera.zoom), camera.world_to_screen_array)
+            for screen_points in traces: draw_trace(screen, screen_points, GREEN, stride)
+        prediction = predictor.result if predicting else None
+        if prediction:
+            # Mulai dari langkah simulasi sekarang; bagian yang sudah dilalui tidak digambar
+            offset = engine.step_count - prediction['step']
+            if 0 <= offset < prediction['count'] - 1:
+                rows = prediction['positions'][:prediction['bodies'], offset:prediction['count']]
+                for row in rows:
+                    row = row[~np.isnan(row[:, 0])]
+                    if len(row) > 1:
+                        draw_trace(screen, camera.world_to_screen_array(row), PREDICT_COLOR, quality_settings['tracer_stride'])
+        profiler.lap('tracer')
             
         # Gambar Pratinjau Alat
         if current_tool == "POLYGON" and len(polygon_points) > 0:
@@ -646,75 +1096,86 @@ def main():
                 pygame.draw.lines(screen, UI_TEXT, False, screen_points, 2)
             for p in screen_points:
                 pygame.draw.circle(screen, UI_TEXT, p, 4)
+        elif current_tool == "GRID_FILL" and grid_start is not None:
+            corner = camera.world_to_screen(grid_start)
+            fill_rect = pygame.Rect(corner, (mouse_pos[0] - corner[0], mouse_pos[1] - corner[1]))
+            fill_rect.normalize()
+            pygame.draw.rect(screen, UI_TEXT, fill_rect, 1)
+        elif current_tool == "EMITTER" and not is_mouse_on_ui:
+            pygame.draw.circle(screen, UI_TEXT, mouse_pos, max(2, int(EMITTER_RADIUS * 2 * camera.zoom)), 1)
         elif current_tool in ["PIN_JOINT", "SPRING"] and joint_tool_body1:
             start_pos = camera.world_to_screen(joint_tool_body1.position)
             end_pos = mouse_pos
             pygame.draw.line(screen, CYAN_HIGHLIGHT, start_pos, end_pos, 3, )
             pygame.draw.circle(screen, UI_BUTTON_SELECTED, start_pos, 8)
         
-        # Gambar UI Panel
-        pygame.draw.rect(screen, UI_BG, (UI_PANEL_X, 0, UI_PANEL_WIDTH, HEIGHT))
-        pygame.draw.line(screen, UI_BORDER, (UI_PANEL_X, 0), (UI_PANEL_X, HEIGHT), 2)
-        
-        # Gambar Tombol Tab
-        for btn in tab_buttons: btn.draw(screen, is_selected=(current_tab == btn.text))
-        y_cursor = 70
-        
-        # Gambar Konten Tab
-        if current_tab == "Tools":
-            title_surf = FONT_TITLE.render("Tools", True, UI_TEXT)
-            screen.blit(title_surf, (UI_PANEL_X + 20, y_cursor))
-            y_cursor += 30
-            for btn in tool_buttons: btn.draw(screen, is_selected=(current_tool == btn.text))
-            
-            y_cursor += 120
-            title_surf = FONT_TITLE.render("Object Properties", True, UI_TEXT)
-            screen.blit(title_surf, (UI_PANEL_X + 20, y_cursor))
-            y_cursor += 40
-            sliders['density'].rect.y = y_cursor; sliders['density'].draw(screen); y_cursor += 50
-            sliders['friction'].rect.y = y_cursor; sliders['friction'].draw(screen); y_cursor += 50
-            sliders['elasticity'].rect.y = y_cursor; sliders['elasticity'].draw(screen); y_cursor += 50
-        elif current_tab == "World":
-            title_surf = FONT_TITLE.render("World Properties", True, UI_TEXT)
-            screen.blit(title_surf, (UI_PANEL_X + 20, y_cursor))
-            y_cursor += 40
-            sliders['gravity_y'].draw(screen)
-            y_cursor += 50
-            sliders['damping'].draw(screen)
-        elif current_tab == "Statistics":
-            title_surf = FONT_TITLE.render("Statistics", True, UI_TEXT)
-            screen.blit(title_surf, (UI_PANEL_X + 20, y_cursor))
-            y_cursor += 40
-            
-            if selected_body:
-                draw_graph(screen, pygame.Rect(UI_PANEL_X + 20, y_cursor, 310, 100), 
-                           data_collector.data[current_plot_var], 
-                           data_collector.labels[current_plot_var], GREEN)
-                y_cursor += 110
-                
-                plot_title_surf = FONT_NORMAL.render("Plot Variable:", True, UI_TEXT)
-                screen.blit(plot_title_surf, (UI_PANEL_X + 20, y_cursor))
-                y_cursor += 30
-                
-                for btn in stat_buttons:
-                    if btn.callback == export_csv: continue # Lewati tombol export
-                    is_selected = (current_plot_var == next(k for k,v in data_collector.labels.items() if v == btn.text))
-                    btn.draw(screen, is_selected)
-            else:
-                text_surf = FONT_NORMAL.render("Select a dynamic object to see stats.", True, UI_TEXT)
-                screen.blit(text_surf, (UI_PANEL_X + 20, y_cursor + 40))
+        # Gambar UI Panel (di-cache per tab, digambar ulang hanya jika state berubah)
+        panel_state = (current_tool, current_plot_var, selected_body is not None, recorder is not None, data_collector.points,
+                       tuple(elem.is_hovered for elem in all_ui_elements),
+                       tuple(s.val for s in sliders.values()), quality.level)
+        cached_state, panel_surf = panel_cache.get(current_tab, (None, None))
+        # Di level kualitas rendah panel hanya boleh digambar ulang setiap ui_interval frame
+        if panel_surf is None or (cached_state != panel_state and ui_refresh):
+            panel_surf = panel_surf or pygame.Surface((UI_PANEL_WIDTH, HEIGHT))
+            draw_panel(panel_surf, (UI_PANEL_X, 0))
+            panel_cache[current_tab] = (panel_state, panel_surf)
+        screen.blit(panel_surf, (UI_PANEL_X, 0))
 
-        # Gambar Tombol Scene (selalu terlihat)
-        for btn in scene_buttons: btn.draw(screen)
-        # Gambar Tombol Statistik (selalu terlihat)
-        for btn in stat_buttons:
-             if btn.callback == export_csv:
-                btn.draw(screen)
+        # Grafik berubah tiap langkah, jadi digambar langsung di atas panel
+        if current_tab == "Statistics" and (selected_body or current_plot_var.startswith('sys_')):
+            if ui_refresh or graph_surf_key != graph_key:
+                graph_surf.fill(UI_BG)
+                draw_graph(graph_surf, graph_surf.get_rect(), graph, data_collector.labels[current_plot_var], GREEN)
+                graph_surf_key = graph_key
+            screen.blit(graph_surf, (UI_PANEL_X + 20, 110))
+
+        # Status rekaman (berubah tiap langkah)
+        if recorder:
+            status = f"REC {recorder.pushed} steps, {recorder.dropped} dropped"
+            screen.blit(FONT_NORMAL.render(status, True, RED if recorder.dropped else UI_TEXT), (UI_PANEL_X + 20, HEIGHT - 140))
+
+        if engine.history and not simulation_running and not scene_loader:
+            status = f"Replay step {engine.step_count} / {engine.history.last_step}  (SPACE resume, arrows scrub)"
+            screen.blit(FONT_NORMAL.render(status, True, UI_TEXT), (20, 20))
+
+        if quality.level:
+            status = f"Reduced quality: level {quality.level}"
+            screen.blit(render_text(FONT_NORMAL, status, UI_TEXT), (20, HEIGHT - 30))
+
+        if scene_loader:
+            status = f"Loading {scene_loader.progress:.0%}"
+            screen.blit(FONT_HEADER.render(status, True, UI_TEXT), (20, 20))
+
+        if show_profile:
+            if profile_surf is None or profiler.frame_count % PROFILE_OVERLAY_REFRESH == 0:
+                profile_surf = render_profile(profiler.percentiles())
+            screen.blit(profile_surf, (20, 50))
+        profiler.lap('ui')
+
+        if frame_surface:
+            display.blit(frame_surface, (0, 0))
+            capture.submit(frame_surface) # surface dibaca writer; tidak digambar lagi frame ini
+        if capture:
+            status = f"CAP {capture.captured} frames, {capture.dropped} dropped"
+            display.blit(FONT_NORMAL.render(status, True, RED if capture.error else UI_TEXT), (20, HEIGHT - 55))
+        profiler.lap('capture')
 
         pygame.display.flip()
-        clock.tick(FPS)
+        profiler.lap('flip')
+        if startup is not None:
+            print(f"Startup: import {IMPORT_MS:.0f} ms, first frame {(time.perf_counter() - startup) * 1000:.0f} ms")
+            startup = None
+        frame_time = clock.tick(FPS) / 1000
+        profiler.lap('idle')
 
+    if physics_worker: physics_worker.stop()
+    if recorder: recorder.stop()
+    if capture: capture.stop()
+    predictor.stop(wait=False)
+    scene_writer.stop()
     pygame.quit()
 
+IMPORT_MS = (time.perf_counter() - IMPORT_START) * 1000
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
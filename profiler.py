@@ -0,0 +1,97 @@
+import numpy as np
+import json
+import time
+
+# --- Konfigurasi Profiler ---
+PROFILE_PHASES = ['events', 'physics', 'telemetry', 'world', 'joints', 'tracer', 'ui', 'capture', 'flip', 'idle']
+PROFILE_FRAMES = 600      # jendela bergulir untuk p50/p99
+PROFILE_LAPS_PER_FRAME = 32
+
+# --- Profiler Per Fase (perf_counter_ns, array berukuran tetap) ---
+class FrameProfiler:
+    def __init__(self, phases=PROFILE_PHASES, frames=PROFILE_FRAMES, laps_per_frame=PROFILE_LAPS_PER_FRAME):
+        self.phases = list(phases)
+        self.index = {name: i for i, name in enumerate(self.phases)}
+        self.frames = frames
+        # Total per fase per frame (ns) untuk statistik
+        self.durations = np.zeros((frames, len(self.phases)), dtype=np.int64)
+        self.frame_starts = np.zeros(frames, dtype=np.int64)
+        self.frame_count = 0
+        # Setiap lap juga dicatat terpisah untuk trace (fase bisa bergantian dalam satu frame)
+        self.lap_capacity = frames * laps_per_frame
+        self.lap_phase = np.zeros(self.lap_capacity, dtype=np.int16)
+        self.lap_start = np.zeros(self.lap_capacity, dtype=np.int64)
+        self.lap_end = np.zeros(self.lap_capacity, dtype=np.int64)
+        self.lap_count = 0
+        self._row = 0
+        self._last = None
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        self._row = self.frame_count % self.frames
+        self.durations[self._row] = 0
+        self.frame_starts[self._row] = now
+        self.frame_count += 1
+        self._last = now
+
+    def lap(self, phase):
+        # Waktu sejak lap sebelumnya dihitung ke fase ini
+        if self._last is None: return
+        now = time.perf_counter_ns()
+        i = self.index[phase]
+        self.durations[self._row, i] += now - self._last
+        slot = self.lap_count % self.lap_capacity
+        self.lap_phase[slot] = i
+        self.lap_start[slot] = self._last
+        self.lap_end[slot] = now
+        self.lap_count += 1
+        self._last = now
+
+    def last_busy(self):
+        # Waktu sibuk (tanpa 'idle') frame terakhir yang selesai dalam milidetik, None sebelum ada
+        if self.frame_count < 2: return None
+        row = self.durations[(self.frame_count - 2) % self.frames]
+        idle = row[self.index['idle']] if 'idle' in self.index else 0
+        return (row.sum() - idle) / 1e6
+
+    def _completed_rows(self):
+        # Indeks frame yang sudah selesai, terlama dulu (frame yang sedang berjalan tidak dihitung)
+        count = min(self.frame_count - 1, self.frames - 1)
+        return np.arange(self.frame_count - 1 - count, self.frame_count - 1) % self.frames
+
+    def percentiles(self, q=(50, 99)):
+        # {fase: (p50, p99)} dalam milidetik, ditambah 'busy' (tanpa 'idle') dan 'frame' untuk total
+        rows = self.durations[self._completed_rows()]
+        if not len(rows): return {}
+        per_phase = np.percentile(rows, q, axis=0) / 1e6
+        stats = {name: tuple(per_phase[:, i]) for i, name in enumerate(self.phases)}
+        busy = [i for i, name in enumerate(self.phases) if name != 'idle']
+        stats['busy'] = tuple(np.percentile(rows[:, busy].sum(axis=1), q) / 1e6)
+        stats['frame'] = tuple(np.percentile(rows.sum(axis=1), q) / 1e6)
+        return stats
+
+    def trace_events(self):
+        # Format trace-event Chrome (chrome://tracing / Perfetto), ts dan dur dalam mikrodetik
+        rows = self._completed_rows()
+        if not len(rows): return []
+        frame_starts = self.frame_starts[np.append(rows, self._row)]
+        origin = int(frame_starts[0])
+        count = min(self.lap_count, self.lap_capacity)
+        order = np.arange(self.lap_count - count, self.lap_count) % self.lap_capacity
+        order = order[(self.lap_start[order] >= origin) & (self.lap_start[order] < frame_starts[-1])]
+        phase, start, end = self.lap_phase[order], self.lap_start[order], self.lap_end[order]
+
+        events = [{'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 0,
+                   'ts': (a - origin) / 1e3, 'dur': (b - a) / 1e3}
+                  for a, b in zip(frame_starts[:-1].tolist(), frame_starts[1:].tolist())]
+        events += [{'name': self.phases[p], 'ph': 'X', 'pid': 1, 'tid': 1,
+                    'ts': (a - origin) / 1e3, 'dur': (b - a) / 1e3}
+                   for p, a, b in zip(phase.tolist(), start.tolist(), end.tolist())]
+        events += [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+                   for tid, name in ((0, 'frames'), (1, 'phases'))]
+        return events
+
+    def write_trace(self, filename):
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+        print(f"Profile trace saved to {filename}")
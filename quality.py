@@ -0,0 +1,66 @@
+import numpy as np
+
+# --- Konfigurasi Kualitas Adaptif ---
+# Level 0 = kualitas penuh; setiap level berikutnya lebih murah. max_substeps membatasi slider substep,
+# coil_segments 0 = pegas digambar sebagai garis lurus, tracer_stride = ambil setiap titik ke-N jejak,
+# ui_interval = panel dan grafik digambar ulang setiap N frame
+QUALITY_LEVELS = [
+    {'iterations': 10, 'max_substeps': 8, 'coil_segments': 10, 'tracer_stride': 1, 'ui_interval': 1},
+    {'iterations': 8, 'max_substeps': 4, 'coil_segments': 6, 'tracer_stride': 2, 'ui_interval': 2},
+    {'iterations': 6, 'max_substeps': 2, 'coil_segments': 4, 'tracer_stride': 4, 'ui_interval': 4},
+    {'iterations': 4, 'max_substeps': 1, 'coil_segments': 0, 'tracer_stride': 8, 'ui_interval': 8},
+]
+QUALITY_WINDOW = 30           # frame per keputusan
+QUALITY_PERCENTILE = 90       # waktu sibuk yang dibandingkan dengan anggaran
+QUALITY_DEGRADE_AT = 0.9      # turunkan kualitas di atas porsi anggaran frame ini
+QUALITY_RESTORE_AT = 0.6      # naikkan kualitas hanya bila di bawah porsi ini...
+QUALITY_RESTORE_WINDOWS = 3   # ...selama sekian jendela berturut-turut
+QUALITY_MAX_RESTORE_WINDOWS = 24
+
+# --- Pengendali Anggaran Frame ---
+class QualityController:
+    def __init__(self, budget_ms, levels=QUALITY_LEVELS, window=QUALITY_WINDOW):
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.level = 0
+        self.busy = np.zeros(window)
+        self.count = 0
+        self.headroom = 0 # jendela berturut-turut dengan ruang sisa
+        self.restore_windows = QUALITY_RESTORE_WINDOWS
+        self._restored_at = None # jendela saat kualitas terakhir dinaikkan
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def update(self, busy_ms):
+        # Satu sampel per frame; kembalikan True bila level berubah
+        if busy_ms is None: return False
+        self.busy[self.count % len(self.busy)] = busy_ms
+        self.count += 1
+        if self.count % len(self.busy): return False
+
+        windows = self.count // len(self.busy)
+        load = np.percentile(self.busy, QUALITY_PERCENTILE) / self.budget_ms
+        if load > QUALITY_DEGRADE_AT:
+            self.headroom = 0
+            if self.level == len(self.levels) - 1: return False
+            # Turun lagi tepat setelah naik: tunggu lebih lama sebelum mencoba naik berikutnya
+            if self._restored_at is not None and windows - self._restored_at <= 2:
+                self.restore_windows = min(self.restore_windows * 2, QUALITY_MAX_RESTORE_WINDOWS)
+            return self._set_level(self.level + 1)
+        if load < QUALITY_RESTORE_AT and self.level > 0:
+            self.headroom += 1
+            if self.headroom >= self.restore_windows:
+                self.headroom = 0
+                self._restored_at = windows
+                return self._set_level(self.level - 1)
+            return False
+        self.headroom = 0
+        if load < QUALITY_RESTORE_AT: self.restore_windows = QUALITY_RESTORE_WINDOWS # stabil di kualitas penuh
+        return False
+
+    def _set_level(self, level):
+        self.level = level
+        print(f"Quality level {level} ({', '.join(f'{k}={v}' for k, v in self.settings.items())})")
+        return True
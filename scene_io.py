@@ -0,0 +1,215 @@
+import numpy as np
+import json
+import os
+import queue
+import threading
+
+# --- Konfigurasi Format Scene ---
+# Scene kecil disimpan sebagai JSON yang mudah dibaca; di atas ambang ini memakai .npz biner
+BINARY_SCENE_THRESHOLD = 2000
+LOAD_CHUNK_SIZE = 500 # objek per frame saat memuat bertahap
+SAVE_QUEUE_SIZE = 2
+
+OBJECT_TYPES = ['circle', 'box', 'polygon']
+JOINT_TYPES = ['pin', 'spring']
+
+# --- Konversi JSON <-> Array ---
+def scene_to_json_data(arrays):
+    scene_data = dict(arrays['meta'])
+    scene_data['objects'] = []
+    scene_data['joints'] = []
+
+    ids, types = arrays['id'].tolist(), arrays['type'].tolist()
+    pos, vel = arrays['pos'].tolist(), arrays['vel'].tolist()
+    angle, ang_vel = arrays['angle'].tolist(), arrays['ang_vel'].tolist()
+    mass, friction, elasticity = arrays['mass'].tolist(), arrays['friction'].tolist(), arrays['elasticity'].tolist()
+    radius, size = arrays['radius'].tolist(), arrays['size'].tolist()
+    offsets, vertices = arrays['vert_offsets'].tolist(), arrays['vertices'].tolist()
+    for i in range(len(ids)):
+        obj_data = {
+            'id': ids[i],
+            'type': OBJECT_TYPES[types[i]],
+            'pos': pos[i],
+            'angle': angle[i],
+            'vel': vel[i],
+            'ang_vel': ang_vel[i],
+            'friction': friction[i],
+            'elasticity': elasticity[i],
+            'mass': mass[i]
+        }
+        if obj_data['type'] == 'circle':
+            obj_data['radius'] = radius[i]
+        elif obj_data['type'] == 'box':
+            obj_data['size'] = size[i]
+        elif obj_data['type'] == 'polygon':
+            obj_data['vertices'] = vertices[offsets[i]:offsets[i + 1]]
+        scene_data['objects'].append(obj_data)
+
+    joint_types = arrays['joint_type'].tolist()
+    body_a, body_b = arrays['joint_a'].tolist(), arrays['joint_b'].tolist()
+    anchor_a, anchor_b = arrays['anchor_a'].tolist(), arrays['anchor_b'].tolist()
+    rest_length, stiffness, damping = arrays['rest_length'].tolist(), arrays['stiffness'].tolist(), arrays['damping'].tolist()
+    for i in range(len(joint_types)):
+        joint_data = {
+            'type': JOINT_TYPES[joint_types[i]],
+            'body_a_id': body_a[i],
+            'body_b_id': body_b[i],
+            'anchor_a': anchor_a[i],
+            'anchor_b': anchor_b[i],
+        }
+        if not np.isnan(rest_length[i]):
+            joint_data['rest_length'] = rest_length[i] # jarak pin atau panjang pegas
+        if joint_data['type'] == 'spring':
+            joint_data['stiffness'] = stiffness[i]
+            joint_data['damping'] = damping[i]
+        scene_data['joints'].append(joint_data)
+    return scene_data
+
+def json_data_to_arrays(scene_data):
+    objects = [o for o in scene_data.get('objects', []) if o['type'] in OBJECT_TYPES]
+    joints = [j for j in scene_data.get('joints', []) if j['type'] in JOINT_TYPES]
+    vertex_lists = [o['vertices'] if o['type'] == 'polygon' else [] for o in objects]
+    counts = [len(v) for v in vertex_lists]
+    return {
+        'meta': {key: value for key, value in scene_data.items() if key not in ('objects', 'joints')},
+        'id': np.array([o['id'] for o in objects], dtype=np.int64),
+        'type': np.array([OBJECT_TYPES.index(o['type']) for o in objects], dtype=np.uint8),
+        'pos': np.array([o['pos'] for o in objects], dtype=float).reshape(-1, 2),
+        'vel': np.array([o['vel'] for o in objects], dtype=float).reshape(-1, 2),
+        'angle': np.array([o['angle'] for o in objects], dtype=float),
+        'ang_vel': np.array([o['ang_vel'] for o in objects], dtype=float),
+        'mass': np.array([o.get('mass', 1) for o in objects], dtype=float),
+        'friction': np.array([o['friction'] for o in objects], dtype=float),
+        'elasticity': np.array([o['elasticity'] for o in objects], dtype=float),
+        'radius': np.array([o.get('radius', 0) for o in objects], dtype=float),
+        'size': np.array([o.get('size', (0, 0)) for o in objects], dtype=float).reshape(-1, 2),
+        'vert_offsets': np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+        'vertices': np.array([v for verts in vertex_lists for v in verts], dtype=float).reshape(-1, 2),
+        'joint_type': np.array([JOINT_TYPES.index(j['type']) for j in joints], dtype=np.uint8),
+        'joint_a': np.array([j['body_a_id'] if j['body_a_id'] is not None else -1 for j in joints], dtype=np.int64),
+        'joint_b': np.array([j['body_b_id'] if j['body_b_id'] is not None else -1 for j in joints], dtype=np.int64),
+        'anchor_a': np.array([j['anchor_a'] for j in joints], dtype=float).reshape(-1, 2),
+        'anchor_b': np.array([j['anchor_b'] for j in joints], dtype=float).reshape(-1, 2),
+        'rest_length': np.array([j.get('rest_length', np.nan) for j in joints], dtype=float),
+        'stiffness': np.array([j.get('stiffness', 2000) for j in joints], dtype=float),
+        'damping': np.array([j.get('damping', 30) for j in joints], dtype=float),
+    }
+
+# --- Baca & Tulis File ---
+def write_scene(filename, arrays):
+    if filename.endswith('.npz'):
+        columns = {key: value for key, value in arrays.items() if key != 'meta'}
+        np.savez(filename, meta=np.array(json.dumps(arrays['meta'])), **columns)
+    else:
+        with open(filename, 'w') as f:
+            json.dump(scene_to_json_data(arrays), f, indent=2)
+
+def read_scene(filename):
+    if filename.endswith('.npz'):
+        with np.load(filename) as data:
+            arrays = {key: data[key] for key in data.files if key != 'meta'}
+            arrays['meta'] = json.loads(str(data['meta']))
+        return arrays
+    with open(filename, 'r') as f:
+        return json_data_to_arrays(json.load(f))
+
+def write_scene_atomic(filename, arrays):
+    # Tulis ke file sementara lalu ganti nama, agar file lama tidak pernah setengah tertulis
+    root, ext = os.path.splitext(filename)
+    tmp_name = f"{root}.tmp{ext}"
+    try:
+        write_scene(tmp_name, arrays)
+        os.replace(tmp_name, filename)
+    except BaseException:
+        if os.path.exists(tmp_name): os.remove(tmp_name)
+        raise
+
+# --- Penulis Scene (encoding & I/O di thread terpisah) ---
+class SceneWriter:
+    def __init__(self, queue_size=SAVE_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.saved = 0
+        self.skipped = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="scene-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def save(self, filename, arrays):
+        # arrays harus berupa snapshot (lihat SimulationEngine.scene_arrays); tidak pernah memblokir
+        try:
+            self.queue.put_nowait((filename, arrays))
+            return True
+        except queue.Full:
+            self.skipped += 1
+            print(f"Save to {filename} skipped: previous saves still writing")
+            return False
+
+    @property
+    def busy(self):
+        return self.queue.unfinished_tasks > 0
+
+    def flush(self):
+        # Tunggu semua simpanan yang diantre selesai ditulis
+        self.queue.join()
+
+    def stop(self, wait=True):
+        # Simpanan yang sudah diantre tetap ditulis sebelum thread berhenti
+        self.queue.put(None)
+        if wait: self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None: break
+            filename, arrays = item
+            try:
+                write_scene_atomic(filename, arrays)
+                self.saved += 1
+                print(f"Scene saved to {filename}")
+            except (OSError, ValueError, TypeError) as e:
+                self.error = e
+                print(f"Error saving scene: {e}")
+            finally:
+                self.queue.task_done()
+
+# --- Pemuat Bertahap ---
+class SceneLoader:
+    def __init__(self, engine, arrays, filename=None, chunk_size=LOAD_CHUNK_SIZE):
+        # chunk_size None = muat semuanya sekaligus; tanpa filename tidak ada pesan
+        self.engine = engine
+        self.arrays = arrays
+        self.filename = filename
+        self.meta = arrays['meta']
+        self.n_objects = len(arrays['id'])
+        self.n_joints = len(arrays['joint_type'])
+        self.chunk_size = chunk_size or max(1, self.n_objects + self.n_joints)
+        self.object_row = 0
+        self.joint_row = 0
+
+    @property
+    def done(self):
+        return self.object_row >= self.n_objects and self.joint_row >= self.n_joints
+
+    @property
+    def progress(self):
+        total = self.n_objects + self.n_joints
+        return (self.object_row + self.joint_row) / total if total else 1.0
+
+    def step(self):
+        # Tambahkan satu chunk objek (lalu sambungan) ke engine
+        if self.object_row < self.n_objects:
+            stop = min(self.object_row + self.chunk_size, self.n_objects)
+            self.engine.add_objects_from_arrays(self.arrays, self.object_row, stop)
+            self.object_row = stop
+        elif self.joint_row < self.n_joints:
+            stop = min(self.joint_row + self.chunk_size, self.n_joints)
+            self.engine.add_joints_from_arrays(self.arrays, self.joint_row, stop)
+            self.joint_row = stop
+        if self.done and self.filename:
+            print(f"Scene loaded from {self.filename}")
+        return self.done
+
+    def run(self):
+        while not self.step(): pass
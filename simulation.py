@@ -0,0 +1,1522 @@
+import pymunk
+import pymunk.batch
+import numpy as np
+import math
+import json
+import itertools
+import sys
+import time
+import zipfile
+import queue
+import threading
+import bisect
+from collections import deque
+
+from scene_io import OBJECT_TYPES, JOINT_TYPES, LOAD_CHUNK_SIZE, write_scene_atomic, read_scene, SceneLoader
+
+# --- Konfigurasi Dunia ---
+# Ukuran dunia default sama dengan ukuran jendela sandbox
+WORLD_WIDTH, WORLD_HEIGHT = 1600, 900
+PHYSICS_DT = 1 / 60
+PHYSICS_SUBSTEPS = 1
+MAX_CATCHUP_STEPS = 5
+# Body yang diam selama SLEEP_TIME_THRESHOLD detik ditidurkan (0 = nonaktif);
+# IDLE_SPEED_THRESHOLD 0 = Chipmunk memperkirakannya dari gravitasi
+SLEEP_TIME_THRESHOLD = 0.5
+IDLE_SPEED_THRESHOLD = 0.0
+# Solver multi-thread Chipmunk saat ini dibatasi 2 thread (tidak didukung di Windows)
+PHYSICS_THREADS = 2
+
+# Rentang parameter yang bisa diatur (min, max, default); dipakai slider UI dan sweep
+PARAMETER_RANGES = {
+    'density': (0.1, 5.0, 1.0),
+    'friction': (0.0, 2.0, 0.7),
+    'elasticity': (0.0, 1.5, 0.8),
+    'gravity_y': (-2000, 2000, -981),
+    'damping': (0.9, 1.0, 0.998),
+}
+
+# --- Pengambilan Array ---
+def gather_vectors(bodies, attr):
+    # Kumpulkan atribut Vec2d dari banyak body ke array (N, 2) tanpa tuple perantara numpy
+    flat = itertools.chain.from_iterable([getattr(body, attr) for body in bodies])
+    return np.fromiter(flat, dtype=float, count=2 * len(bodies)).reshape(-1, 2)
+
+def gather_scalars(bodies, attr):
+    return np.fromiter([getattr(body, attr) for body in bodies], dtype=float, count=len(bodies))
+
+# Kolom per body dari pymunk.batch: pos (2), angle, vel (2), ang_vel
+BATCH_FIELDS = (pymunk.batch.BodyFields.BODY_ID | pymunk.batch.BodyFields.POSITION | pymunk.batch.BodyFields.ANGLE
+                | pymunk.batch.BodyFields.VELOCITY | pymunk.batch.BodyFields.ANGULAR_VELOCITY)
+
+# --- Kelas Pengumpul Data (ring buffer kolumnar untuk semua objek) ---
+TELEMETRY_POINTS = 600                # panjang riwayat maksimum per objek (dan total sistem)
+TELEMETRY_MIN_POINTS = 8
+TELEMETRY_BLOCK = 1024                # slot objek per blok; blok baru ditambahkan tanpa menyalin yang lama
+TELEMETRY_MEMORY_BYTES = 64 * 2**20   # di atas ini riwayat semua objek dipersingkat (grafik memakai GraphBuffer)
+RAW_METRICS = ['pos_x', 'pos_y', 'vel_x', 'vel_y', 'ke', 'pe']
+
+class DataCollector:
+    def __init__(self, max_points=TELEMETRY_POINTS, reference_y=WORLD_HEIGHT / 2, block=TELEMETRY_BLOCK,
+                 memory_budget=TELEMETRY_MEMORY_BYTES):
+        self.enabled = True # nonaktif: record_data tidak mengumpulkan apa pun dan buffer dilepas
+        self.max_points = max_points
+        self.reference_y = reference_y
+        self.block = block
+        self.memory_budget = memory_budget
+        self.labels = {
+            'pos_x': 'Position X', 'pos_y': 'Position Y',
+            'vel_x': 'Velocity X', 'vel_y': 'Velocity Y', 'vel_mag': 'Speed',
+            'ke': 'Kinetic E', 'pe': 'Potential E', 'total_e': 'Total E',
+            'sys_ke': 'System KE', 'sys_pe': 'System PE', 'sys_e': 'System E'
+        }
+        self.reset()
+
+    def reset(self):
+        # Baris terbaru per slot + blok riwayat (waktu x slot x metrik) yang ditimpa melingkar
+        self.points = self.max_points # panjang riwayat per objek saat ini (<= max_points)
+        self.capacity = 0
+        self.current = np.zeros((0, len(RAW_METRICS)), dtype=np.float32)
+        self.blocks = []
+        self.totals = np.zeros((self.max_points, 3), dtype=np.float64)
+        self.masses = np.zeros(0)
+        self.birth = np.zeros(0, dtype=np.int64)
+        self.slot_ids = np.zeros(0, dtype=np.int64)
+        self.slot_of = {}
+        self.free_slots = []
+        self.count = 0
+        self._version = None
+        self._bodies = []
+        self._slots = np.zeros(0, dtype=np.intp)
+        self._ids = np.zeros(0, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return sum(block.nbytes for block in self.blocks)
+
+    def _grow(self):
+        # Satu blok slot baru; bila anggaran memori terlampaui, panjang riwayat dibagi dua
+        old, n = self.capacity, self.block
+        self.capacity += n
+        self.current = np.concatenate((self.current, np.zeros((n, len(RAW_METRICS)), dtype=np.float32)))
+        self.masses = np.concatenate((self.masses, np.zeros(n)))
+        self.birth = np.concatenate((self.birth, np.zeros(n, dtype=np.int64)))
+        self.slot_ids = np.concatenate((self.slot_ids, np.full(n, -1, dtype=np.int64)))
+        self.free_slots.extend(range(self.capacity - 1, old - 1, -1))
+        row_bytes = self.capacity * len(RAW_METRICS) * 4
+        points = self.points
+        while points > TELEMETRY_MIN_POINTS and points * row_bytes > self.memory_budget:
+            points //= 2
+        if points != self.points: self._resize(max(points, TELEMETRY_MIN_POINTS))
+        self.blocks.append(np.zeros((self.points, n, len(RAW_METRICS)), dtype=np.float32))
+
+    def _resize(self, points):
+        # Simpan hanya sampel terbaru; indeks ring dihitung ulang untuk panjang baru
+        samples = np.arange(max(0, self.count - points), self.count)
+        for i, block in enumerate(self.blocks):
+            resized = np.zeros((points, block.shape[1], block.shape[2]), dtype=np.float32)
+            resized[samples % points] = block[samples % self.points]
+            self.blocks[i] = resized
+        self.points = points
+
+    def _sync(self, registry):
+        # Petakan objek dinamis registri ke slot buffer (hanya saat registri berubah)
+        bodies = [record['shape'].body for record in registry]
+        bodies = [body for body in bodies if body.body_type == pymunk.Body.DYNAMIC and body.mass > 0]
+        # Body dari pool bisa kembali dengan id lain: dianggap objek baru
+        alive = {body: registry.id_of(body) for body in bodies}
+        for body in [body for body, slot in self.slot_of.items() if alive.get(body) != self.slot_ids[slot]]:
+            self.free_slots.append(self.slot_of.pop(body))
+        for body in bodies:
+            if body in self.slot_of: continue
+            if not self.free_slots: self._grow()
+            slot = self.free_slots.pop()
+            self.slot_of[body] = slot
+            self.slot_ids[slot] = alive[body]
+            self.masses[slot] = body.mass
+            self.birth[slot] = self.count
+        self._bodies = bodies
+        self._slots = np.array([self.slot_of[body] for body in bodies], dtype=np.intp)
+        self._ids = np.array([alive[body] for body in bodies], dtype=np.int64)
+        self._version = registry.version
+
+    def update(self, registry, gravity_y, skip_sleeping=False):
+        if registry.version != self._version: self._sync(registry)
+        if self._bodies:
+            bodies, slots = self._bodies, self._slots
+            if skip_sleeping and self.count:
+                # Body tidur tidak bergerak: baris terbarunya tetap berlaku, hanya yang bangun dibaca
+                awake = np.fromiter([not body.is_sleeping for body in bodies], dtype=bool, count=len(bodies))
+                awake |= self.birth[slots] == self.count
+                bodies, slots = list(itertools.compress(bodies, awake)), slots[awake]
+            if bodies:
+                pos = gather_vectors(bodies, 'position')
+                vel = gather_vectors(bodies, 'velocity')
+                mass = self.masses[slots]
+                ke = 0.5 * mass * (vel * vel).sum(axis=1)
+                pe = -mass * gravity_y * (pos[:, 1] - self.reference_y) # PE relatif
+                self.current[slots] = np.column_stack((pos, vel, ke, pe))
+            ke, pe = self.current[self._slots, 4].sum(dtype=float), self.current[self._slots, 5].sum(dtype=float)
+            self.totals[self.count % self.max_points] = (ke, pe, ke + pe)
+        else:
+            self.totals[self.count % self.max_points] = 0.0
+        # Salinan baris utuh per blok (tanpa indeks acak)
+        t = self.count % self.points
+        for i, block in enumerate(self.blocks):
+            block[t] = self.current[i * self.block:(i + 1) * self.block]
+        self.count += 1
+
+    def latest_sample(self):
+        # (id objek, metrik mentah) dari langkah terakhir; salinan, aman dikirim ke thread lain
+        return self._ids, self.current[self._slots]
+
+    def _window(self, start, length):
+        # Indeks buffer dari sampel ke-start hingga terbaru, urut kronologis
+        start = max(start, self.count - length)
+        return np.arange(start, self.count) % length
+
+    def series(self, body, key):
+        # Riwayat objek sejak dibuat, paling banyak self.points sampel terakhir. self.points bisa lebih kecil
+        # dari max_points: di scene besar panjang riwayat dibagi dua agar muat di memory_budget (lihat _grow)
+        if key.startswith('sys_'):
+            return self.totals[self._window(0, self.max_points), ['sys_ke', 'sys_pe', 'sys_e'].index(key)]
+        slot = self.slot_of.get(body)
+        if slot is None:
+            return np.zeros(0)
+        block = self.blocks[slot // self.block]
+        return self._metric(block[self._window(self.birth[slot], self.points), slot % self.block], key)
+
+    def latest(self, body, key):
+        if self.count == 0: return None
+        if key.startswith('sys_'):
+            return self.totals[(self.count - 1) % self.max_points, ['sys_ke', 'sys_pe', 'sys_e'].index(key)]
+        slot = self.slot_of.get(body)
+        if slot is None or self.birth[slot] >= self.count: return None
+        return float(self._metric(self.current[slot], key))
+
+    def _metric(self, h, key):
+        # Metrik turunan dihitung saat dibaca; h berupa satu baris atau array baris
+        if key == 'vel_mag':
+            return np.hypot(h[..., 2], h[..., 3])
+        if key == 'total_e':
+            return h[..., 4] + h[..., 5]
+        return h[..., RAW_METRICS.index(key)]
+
+    def body_keys(self):
+        return [key for key in self.labels if not key.startswith('sys_')]
+
+# --- Buffer Grafik (riwayat panjang, ekstrem inkremental per blok) ---
+GRAPH_POINTS = 2 ** 17 # ~36 menit pada 60 Hz
+GRAPH_BLOCK = 256
+GRAPH_LEVEL_FACTOR = 16 # ekstrem juga disimpan per GRAPH_BLOCK / 16 sampel
+
+class GraphBuffer:
+    def __init__(self, capacity=GRAPH_POINTS, block=GRAPH_BLOCK, factor=GRAPH_LEVEL_FACTOR):
+        self.block = block
+        self.n_blocks = max(2, capacity // block)
+        self.capacity = self.n_blocks * block
+        self.values = np.zeros(self.capacity)
+        # Ukuran unit ekstrem dari halus ke kasar (1 = sampel mentah); tiap unit kelipatan unit sebelumnya
+        self.units = [1]
+        while self.units[-1] * factor < block and block % (self.units[-1] * factor) == 0:
+            self.units.append(self.units[-1] * factor)
+        self.units.append(block)
+        self.level_min = [self.values] + [np.zeros(self.capacity // unit) for unit in self.units[1:]]
+        self.level_max = [self.values] + [np.zeros(self.capacity // unit) for unit in self.units[1:]]
+        self.block_min, self.block_max = self.level_min[-1], self.level_max[-1]
+        self.count = 0
+
+    def reset(self):
+        self.count = 0
+
+    def __len__(self):
+        # Saat buffer berputar, blok yang sedang ditimpa hanya dihitung bagian barunya
+        if self.count <= self.capacity:
+            return self.count
+        return self.capacity - self.block + (self.count - 1) % self.block + 1
+
+    def append(self, value):
+        i = self.count % self.capacity
+        for unit, mins, maxs in zip(self.units[1:], self.level_min[1:], self.level_max[1:]):
+            b = i // unit
+            if i % unit == 0:
+                mins[b] = maxs[b] = value
+            elif value < mins[b]:
+                mins[b] = value
+            elif value > maxs[b]:
+                maxs[b] = value
+        self.values[i] = value
+        self.count += 1
+
+    def extend(self, values):
+        for value in values.tolist():
+            self.append(value)
+
+    @property
+    def last(self):
+        return self.values[(self.count - 1) % self.capacity]
+
+    def _blocks(self):
+        # Indeks blok yang berisi data, urut kronologis (awal jendela selalu di batas blok)
+        length = len(self)
+        first = ((self.count - length) % self.capacity) // self.block
+        used = -(-length // self.block)
+        return (first + np.arange(used)) % self.n_blocks
+
+    def _ordered(self):
+        length = len(self)
+        start = (self.count - length) % self.capacity
+        if start + length <= self.capacity:
+            return self.values[start:start + length]
+        return np.concatenate((self.values[start:], self.values[:start + length - self.capacity]))
+
+    def extrema(self):
+        blocks = self._blocks()
+        return self.block_min[blocks].min(), self.block_max[blocks].max()
+
+    def decimate(self, width):
+        # Satu pasangan (min, max) per kolom piksel. Blok utuh di dalam kolom diambil dari ekstrem blok;
+        # tepi parsial turun ke unit lebih halus, dan hanya < factor sampel mentah per tepi yang dibaca
+        length = len(self)
+        if length <= width:
+            values = self._ordered()
+            return values, values
+        start = (self.count - length) % self.capacity # selalu di batas blok, jadi juga di batas tiap unit
+        edges = np.arange(width + 1) * length // width
+        lo, hi = edges[:-1], edges[1:] # sisa kolom yang belum tercakup, dalam unit level saat ini
+        mins, maxs = np.full(width, np.inf), np.full(width, -np.inf)
+        levels = zip(self.units, self.units[1:], self.level_min, self.level_max)
+        for unit, coarse, level_min, level_max in levels:
+            step = coarse // unit
+            inner_lo, inner_hi = -(-lo // step) * step, hi // step * step
+            # Kepala [lo, inner_lo) dan ekor [inner_hi, hi) masing-masing < step unit
+            head_hi = np.minimum(inner_lo, hi)
+            starts = np.concatenate((lo, np.maximum(inner_hi, head_hi)))
+            stops = np.concatenate((head_hi, hi))
+            # (step, kepala + ekor): indeks dijepit ke unit terakhir rentang (duplikat tidak mengubah min/max),
+            # reduksi antar baris lebih cepat dari reduksi per baris pendek
+            idx = np.minimum(np.arange(step)[:, None] + starts, np.maximum(stops - 1, starts)) + start // unit
+            empty = stops <= starts
+            head_tail_min = level_min.take(idx, mode='wrap').min(axis=0)
+            head_tail_max = level_max.take(idx, mode='wrap').max(axis=0)
+            head_tail_min[empty], head_tail_max[empty] = np.inf, -np.inf
+            mins = np.minimum(mins, np.minimum(head_tail_min[:width], head_tail_min[width:]))
+            maxs = np.maximum(maxs, np.maximum(head_tail_max[:width], head_tail_max[width:]))
+            lo, hi = inner_lo // step, np.maximum(inner_hi, inner_lo) // step
+        # Blok utuh: reduceat dengan batas berselang-seling (awal, akhir) per kolom, ambil segmen genap
+        blocks = self._blocks()
+        whole = hi > lo
+        if whole.any():
+            bounds = np.stack((lo[whole], hi[whole]), axis=1).ravel()
+            blocks = np.append(blocks, blocks[-1]) # batas akhir boleh = len(blocks); segmen ganjil dibuang
+            mins[whole] = np.minimum(mins[whole], np.minimum.reduceat(self.block_min[blocks], bounds)[::2])
+            maxs[whole] = np.maximum(maxs[whole], np.maximum.reduceat(self.block_max[blocks], bounds)[::2])
+        return mins, maxs
+
+# --- Jejak Lintasan (banyak body, array titik dunia berukuran tetap) ---
+TRACER_POINTS = 200     # titik tersimpan per body (ring)
+TRACER_BODIES = 64      # body yang bisa dijejak sekaligus
+TRACER_TOLERANCE = 2.0  # titik dalam jarak ini (unit dunia) dari segmen baru dianggap berlebih
+TRACER_SKIPPED = 64     # titik yang dilewati sejak titik tersimpan terakhir; bila penuh head disimpan
+
+class PathTracer:
+    def __init__(self, capacity=TRACER_POINTS, max_bodies=TRACER_BODIES, tolerance=TRACER_TOLERANCE,
+                 max_skipped=TRACER_SKIPPED):
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self.points = np.zeros((max_bodies, capacity, 2))
+        self.counts = np.zeros(max_bodies, dtype=np.int64) # total titik yang pernah disimpan per slot
+        # Titik yang ditimpa head sejak anchor (titik tersimpan sebelum head); semuanya harus tetap dalam toleransi.
+        # Hanya dicatat bila berjarak >= spacing dari titik catatan sebelumnya (body diam tidak mengisi buffer);
+        # titik catatan diuji dengan toleransi - spacing, jadi titik yang tidak dicatat pun tetap di bawah toleransi
+        self.spacing = tolerance / 4
+        self.skipped = np.zeros((max_bodies, max_skipped, 2))
+        self.skipped_counts = np.zeros(max_bodies, dtype=np.int64)
+        self.free = list(range(max_bodies - 1, -1, -1))
+        self.slot_of = {}
+        self.bodies = [] # diganti (bukan diubah) setiap kali daftar berubah, lihat sample/append
+        self.slots = np.zeros(0, dtype=np.int64)
+        # Cache koordinat layar; hanya titik baru yang ditransformasi selama kamera diam
+        self.screen = np.zeros((max_bodies, capacity, 2), dtype=np.int32)
+        self.screen_counts = np.zeros(max_bodies, dtype=np.int64)
+        self.screen_key = None
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def __contains__(self, body):
+        return body in self.slot_of
+
+    def follow(self, body):
+        if body in self.slot_of: return True
+        if not self.free:
+            print(f"Tracer limit reached ({len(self.slot_of)} bodies)")
+            return False
+        slot = self.free.pop()
+        self.counts[slot] = self.screen_counts[slot] = self.skipped_counts[slot] = 0
+        self.slot_of[body] = slot
+        self._sync()
+        return True
+
+    def unfollow(self, body):
+        slot = self.slot_of.pop(body, None)
+        if slot is None: return
+        self.free.append(slot)
+        self._sync()
+
+    def clear(self):
+        for body in list(self.slot_of): self.unfollow(body)
+
+    def reset(self):
+        # Hapus jejak tanpa berhenti mengikuti body
+        self.counts[:] = 0
+        self.screen_counts[:] = 0
+        self.skipped_counts[:] = 0
+
+    def _sync(self):
+        self.bodies = list(self.slot_of)
+        self.slots = np.array(list(self.slot_of.values()), dtype=np.int64)
+
+    def sample(self):
+        # Posisi semua body yang dijejak; aman dipanggil dari thread fisika
+        bodies = self.bodies
+        return bodies, gather_vectors(bodies, 'position')
+
+    def append(self, sample):
+        # Simplifikasi online: head (titik terbaru) ditimpa bila head dan semua titik yang sudah ditimpanya
+        # tetap dekat segmen dari anchor ke posisi baru, jadi hanya belokan yang menghabiskan slot ring.
+        # Tanpa menguji titik yang dilewati, gerak lambat melengkung merosot jadi satu tali busur panjang.
+        bodies, positions = sample
+        if bodies is not self.bodies or not len(bodies): return # daftar berubah sejak sampel diambil
+        slots, cap = self.slots, self.capacity
+        counts, skipped_counts = self.counts[slots], self.skipped_counts[slots]
+        anchor = self.points[slots, (counts - 2) % cap]
+        head = self.points[slots, (counts - 1) % cap]
+        candidates = np.concatenate([self.skipped[slots], head[:, None]], axis=1) # (body, skipped + head, 2)
+        valid = np.arange(candidates.shape[1]) < skipped_counts[:, None]
+        valid[:, -1] = True
+        segment, rel = positions - anchor, candidates - anchor[:, None]
+        length_sq = np.einsum('ij,ij->i', segment, segment)
+        t = np.clip(np.einsum('ikj,ij->ik', rel, segment) / np.maximum(length_sq, 1e-12)[:, None], 0, 1)
+        deviation = np.hypot(*np.moveaxis(rel - t[..., None] * segment[:, None], -1, 0))
+        deviation[:, :-1] += self.spacing
+        deviation = np.where(valid, deviation, 0).max(axis=1)
+        replace = (counts >= 2) & (deviation < self.tolerance) & (skipped_counts < self.skipped.shape[1])
+        last = np.where(skipped_counts[:, None] > 0, candidates[np.arange(len(slots)), skipped_counts - 1], anchor)
+        record = replace & (np.hypot(*(head - last).T) >= self.spacing)
+        self.skipped[slots[record], skipped_counts[record]] = head[record]
+        self.skipped_counts[slots] = np.where(replace, skipped_counts + record, 0)
+        self.points[slots, np.where(replace, counts - 1, counts) % cap] = positions
+        self.counts[slots] = counts + ~replace
+
+    def trace(self, body):
+        # Titik dunia terurut (terlama dulu)
+        slot = self.slot_of[body]
+        count = self.counts[slot]
+        return self.points[slot, np.arange(max(0, count - self.capacity), count) % self.capacity]
+
+    def screen_traces(self, key, transform):
+        # key = state kamera; transform memetakan array titik dunia (N, 2) ke layar
+        if key != self.screen_key:
+            self.screen_counts[:] = 0
+            self.screen_key = key
+        cap, traces = self.capacity, []
+        for slot in self.slots.tolist():
+            count, done = int(self.counts[slot]), int(self.screen_counts[slot])
+            # Head bisa sudah ditimpa sejak transformasi terakhir, jadi selalu ikut diulang
+            first = max(done - 1, count - cap, 0)
+            if first < count:
+                idx = np.arange(first, count) % cap
+                self.screen[slot, idx] = transform(self.points[slot, idx])
+                self.screen_counts[slot] = count
+            traces.append(self.screen[slot, np.arange(max(0, count - cap), count) % cap])
+        return traces
+
+# --- Registri Objek (indeks O(1)) ---
+class ObjectRegistry:
+    def __init__(self):
+        self.by_id = {}        # id -> record objek
+        self.by_body = {}      # body -> record objek
+        self.joints = {}       # constraint -> record sambungan
+        self.body_joints = {}  # body -> set constraint yang terpasang
+        self.version = 0       # naik setiap kali daftar objek atau sambungan berubah
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def add_object(self, record):
+        body = record['shape'].body
+        self.by_id[record['id']] = record
+        self.by_body[body] = record
+        self.body_joints.setdefault(body, set())
+        self.version += 1
+
+    def add_joint(self, record):
+        c = record['constraint']
+        self.joints[c] = record
+        self.body_joints.setdefault(c.a, set()).add(c)
+        self.body_joints.setdefault(c.b, set()).add(c)
+        self.version += 1
+
+    def replace_constraint(self, old, new):
+        # Ganti objek constraint tanpa mengubah struktur (dipakai saat space dibangun ulang)
+        record = self.joints.pop(old)
+        record['constraint'] = new
+        self.joints[new] = record
+        for body in (old.a, old.b):
+            attached = self.body_joints[body]
+            attached.discard(old)
+            attached.add(new)
+
+    def get(self, body_id):
+        return self.by_id.get(body_id)
+
+    def record_for(self, body):
+        return self.by_body.get(body)
+
+    def id_of(self, body):
+        record = self.by_body.get(body)
+        return record['id'] if record else None
+
+    def remove_joint(self, constraint):
+        record = self.joints.pop(constraint, None)
+        for body in (constraint.a, constraint.b):
+            attached = self.body_joints.get(body)
+            if attached: attached.discard(constraint)
+        if record: self.version += 1
+        return record
+
+    def remove_object(self, body):
+        # Kembalikan record objek dan daftar record sambungan yang ikut terhapus
+        record = self.by_body.pop(body, None)
+        if record:
+            del self.by_id[record['id']]
+            self.version += 1
+        removed_joints = [self.remove_joint(c) for c in list(self.body_joints.pop(body, ()))]
+        return record, removed_joints
+
+    def clear(self):
+        self.by_id.clear()
+        self.by_body.clear()
+        self.joints.clear()
+        self.body_joints.clear()
+        self.version += 1
+
+# --- Snapshot Pose (array, untuk render) ---
+class PoseSnapshot:
+    def __init__(self, version, records, positions, angles, sleeping=None):
+        self.version = version
+        self.records = records      # urutan baris = urutan registri
+        self.positions = positions  # array (N, 2)
+        self.angles = angles        # array (N,)
+        self.sleeping = sleeping    # array bool (N,), None bila sleeping nonaktif
+        self._rows = None
+
+    def pose_of(self, body):
+        if self._rows is None:
+            self._rows = {record['shape'].body: i for i, record in enumerate(self.records)}
+        row = self._rows.get(body)
+        if row is None:
+            return body.position, body.angle
+        return pymunk.Vec2d(*self.positions[row]), self.angles[row]
+
+def interpolate_snapshots(prev, current, alpha):
+    # Snapshot baru di antara dua pose; snapshot masukan tidak diubah
+    if prev is None or prev.version != current.version or alpha >= 1.0:
+        return current
+    positions = prev.positions + (current.positions - prev.positions) * alpha
+    angles = prev.angles + (current.angles - prev.angles) * alpha
+    return PoseSnapshot(current.version, current.records, positions, angles, current.sleeping)
+
+# --- Jam Fisika (timestep tetap) ---
+class PhysicsClock:
+    def __init__(self, dt=PHYSICS_DT, max_steps=MAX_CATCHUP_STEPS):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time):
+        # Tambah waktu frame ke akumulator, kembalikan jumlah langkah dt yang harus dijalankan
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # Frame terlalu lambat: buang sisa waktu agar tidak terjadi spiral kematian
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        # Posisi relatif di antara dua langkah fisika, untuk interpolasi render
+        return min(1.0, self.accumulator / self.dt)
+
+    def reset(self):
+        self.accumulator = 0.0
+
+# --- Pool Body/Shape (lingkaran & kotak dipakai ulang, bukan dialokasikan lagi) ---
+POOL_MAX_PER_KIND = 20000
+
+class BodyPool:
+    def __init__(self, max_per_kind=POOL_MAX_PER_KIND):
+        self.max_per_kind = max_per_kind
+        self.free = {}     # (tipe, radius atau ukuran) -> list (body, shape) di luar space
+        self.created = 0
+        self.reused = 0
+
+    def _create(self, kind):
+        obj_type, dims = kind
+        body = pymunk.Body(1, 1) # massa & momen diisi saat diambil
+        shape = pymunk.Circle(body, dims) if obj_type == 'circle' else pymunk.Poly.create_box(body, dims)
+        self.created += 1
+        return body, shape
+
+    def reserve(self, kind, count):
+        # Alokasikan di muka agar spawn berikutnya tidak membuat objek baru
+        free = self.free.setdefault(kind, [])
+        for _ in range(min(count, self.max_per_kind) - len(free)):
+            free.append(self._create(kind))
+
+    def acquire(self, kind):
+        free = self.free.get(kind)
+        if free:
+            self.reused += 1
+            return free.pop()
+        return self._create(kind)
+
+    def release(self, kind, body, shape):
+        # body dan shape harus sudah dikeluarkan dari space
+        free = self.free.setdefault(kind, [])
+        if len(free) >= self.max_per_kind: return
+        body.velocity = body.force = (0, 0)
+        body.angular_velocity = body.torque = 0
+        pymunk.Body.update_position(body, 0.0) # buang sisa v_bias dari pemakaian sebelumnya
+        free.append((body, shape))
+
+    def __len__(self):
+        return sum(len(free) for free in self.free.values())
+
+# --- Riwayat State (keyframe + input per langkah) ---
+# Pengaturan space yang dibawa saat space dibangun ulang
+SPACE_SETTINGS = ['gravity', 'damping', 'iterations', 'collision_slop', 'collision_bias', 'collision_persistence',
+                  'idle_speed_threshold', 'sleep_time_threshold']
+HISTORY_KEYFRAME_STEPS = 60
+HISTORY_MAX_KEYFRAME_STEPS = 240
+HISTORY_CAPTURE_SHARE = 0.1 # porsi maksimum waktu langkah yang boleh dipakai menyalin keyframe
+HISTORY_MEMORY_BYTES = 256 * 2**20
+# Satu baris per langkah: semua yang dibutuhkan untuk mengulang langkah itu secara deterministik
+INPUT_COLUMNS = ['dt', 'substeps', 'iterations', 'gravity_y', 'damping', 'sleep_time', 'idle_speed', 'drag', 'drag_x', 'drag_y']
+DYNAMIC_COLUMNS = ['pos', 'vel', 'angle', 'ang_vel', 'sleeping']
+
+def array_nbytes(arrays):
+    return sum(value.nbytes for key, value in arrays.items() if key != 'meta')
+
+class Keyframe:
+    def __init__(self, step, sim_time, scene, drag, capacity):
+        self.step = step
+        self.sim_time = sim_time
+        self.scene = scene    # scene_arrays; kolom statis dibagi dengan keyframe lain bila struktur sama
+        self.drag = drag      # (id body, anchor_a, anchor_b, max_force) atau None
+        self.inputs = np.zeros((capacity, len(INPUT_COLUMNS))) # capacity = jarak ke keyframe berikutnya
+        self.count = 0        # jumlah langkah tercatat setelah keyframe
+        self.spawns = {}      # offset langkah -> list array objek yang ditambahkan setelah langkah itu
+
+    @property
+    def static(self):
+        return self.scene['id']
+
+    def spawn_nbytes(self, after=-1):
+        return sum(array_nbytes(arrays) for offset, batch in self.spawns.items() if offset > after for arrays in batch)
+
+    def nbytes(self, shared_static):
+        dynamic = sum(self.scene[key].nbytes for key in DYNAMIC_COLUMNS) + self.inputs.nbytes + self.spawn_nbytes()
+        if shared_static: return dynamic
+        return dynamic + sum(value.nbytes for key, value in self.scene.items() if key != 'meta' and key not in DYNAMIC_COLUMNS)
+
+class StateHistory:
+    def __init__(self, keyframe_steps=HISTORY_KEYFRAME_STEPS, memory_budget=HISTORY_MEMORY_BYTES):
+        self.keyframe_steps = keyframe_steps
+        self.memory_budget = memory_budget
+        self.keyframes = deque()
+        self.steps = []       # langkah tiap keyframe, untuk bisect
+        self.nbytes = 0
+        self.force_keyframe = True
+        self.version = None   # versi registri saat keyframe terakhir / restore
+        self.step_time = 0.0  # waktu langkah sejak keyframe terakhir (detik)
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    @property
+    def first_step(self):
+        return self.keyframes[0].step if self.keyframes else 0
+
+    @property
+    def last_step(self):
+        return self.keyframes[-1].step + self.keyframes[-1].count if self.keyframes else 0
+
+    def needs_keyframe(self, version):
+        # Keyframe baru tiap keyframe_steps langkah, dan segera setelah struktur scene berubah
+        if self.force_keyframe or version != self.version or not self.keyframes: return True
+        return self.keyframes[-1].count >= len(self.keyframes[-1].inputs)
+
+    def interval_for(self, capture_time):
+        # Scene besar mahal disalin; jarangkan keyframe agar biayanya tetap di bawah
+        # HISTORY_CAPTURE_SHARE dari waktu langkah
+        if not self.keyframes or not self.keyframes[-1].count or not self.step_time:
+            return self.keyframe_steps
+        step_time = self.step_time / self.keyframes[-1].count
+        needed = math.ceil(capture_time / (HISTORY_CAPTURE_SHARE * step_time))
+        return max(self.keyframe_steps, min(needed, HISTORY_MAX_KEYFRAME_STEPS))
+
+    def _shares_static(self, i):
+        return i > 0 and self.keyframes[i - 1].static is self.keyframes[i].static
+
+    def add_keyframe(self, keyframe, version):
+        self.keyframes.append(keyframe)
+        self.steps.append(keyframe.step)
+        self.nbytes += keyframe.nbytes(self._shares_static(len(self.keyframes) - 1))
+        self.force_keyframe = False
+        self.version = version
+        self.step_time = 0.0
+        # Buang keyframe tertua bila melebihi anggaran memori
+        while self.nbytes > self.memory_budget and len(self.keyframes) > 1:
+            oldest = self.keyframes.popleft()
+            self.steps.pop(0)
+            self.nbytes -= oldest.nbytes(False)
+            if self.keyframes[0].static is oldest.static:
+                # Kolom statis kini ditanggung keyframe berikutnya
+                self.nbytes += self.keyframes[0].nbytes(False) - self.keyframes[0].nbytes(True)
+
+    def record_spawn(self, arrays):
+        # Objek baru dicatat sebagai event di segmen keyframe terakhir, diputar ulang pada offset yang sama
+        keyframe = self.keyframes[-1]
+        keyframe.spawns.setdefault(keyframe.count, []).append(arrays)
+        self.nbytes += array_nbytes(arrays)
+
+    def record_input(self, row):
+        self.keyframes[-1].inputs[self.keyframes[-1].count] = row
+        self.keyframes[-1].count += 1
+
+    def keyframe_for(self, step):
+        # Keyframe terakhir yang tidak melewati step
+        i = bisect.bisect_right(self.steps, step) - 1
+        return self.keyframes[max(i, 0)]
+
+    def truncate(self, step):
+        # Buang riwayat setelah step (cabang baru dimulai dari sana)
+        while len(self.keyframes) > 1 and self.keyframes[-1].step > step:
+            last = self.keyframes.pop()
+            self.steps.pop()
+            self.nbytes -= last.nbytes(self.keyframes[-1].static is last.static)
+        if self.keyframes:
+            keyframe = self.keyframes[-1]
+            keyframe.count = max(0, min(keyframe.count, step - keyframe.step))
+            self.nbytes -= keyframe.spawn_nbytes(after=keyframe.count)
+            keyframe.spawns = {offset: batch for offset, batch in keyframe.spawns.items() if offset <= keyframe.count}
+
+    def clear(self):
+        self.keyframes.clear()
+        self.steps.clear()
+        self.nbytes = 0
+        self.force_keyframe = True
+
+# --- Mesin Simulasi (tanpa pygame) ---
+class SimulationEngine:
+    def __init__(self, width=WORLD_WIDTH, height=WORLD_HEIGHT, dt=PHYSICS_DT, substeps=PHYSICS_SUBSTEPS,
+                 threaded=False, threads=PHYSICS_THREADS):
+        self.width, self.height = width, height
+        self.dt = dt
+        self.substeps = substeps
+        self.threaded = threaded
+        self.threads = threads
+        self.space = self._new_space()
+        self.space.gravity = (0, -981)
+        # Dipegang selama langkah fisika; thread lain yang membaca/mengubah space harus memegangnya juga
+        self.lock = threading.RLock()
+
+        # Koleksi Objek
+        self.registry = ObjectRegistry()
+        self.next_body_id = 0
+        self.pool = BodyPool()
+
+        self.data_collector = DataCollector(reference_y=height / 2)
+        self.step_count = 0
+        self.sim_time = 0.0
+        self.prev_snapshot = None
+        self._static_cache = (None, None)
+        self._body_ids = (None, None) # (versi registri, id Chipmunk body dalam urutan registri)
+
+        # Seret dengan mouse: body kinematik (di luar space) + PivotJoint
+        self.mouse_body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+        self.drag_joint = None
+        self.history = None
+        self.replay_keyframe = None # keyframe asal state saat ini bila state berasal dari seek, bukan simulasi langsung
+        self.sleep_time = self.idle_speed = None
+        self.set_sleeping(SLEEP_TIME_THRESHOLD, IDLE_SPEED_THRESHOLD)
+
+    def _new_space(self):
+        space = pymunk.Space(threaded=self.threaded)
+        if self.threaded:
+            space.threads = self.threads
+
+        # Tambahkan batas statis
+        static_lines = [
+            pymunk.Segment(space.static_body, (0, 0), (self.width, 0), 5),
+            pymunk.Segment(space.static_body, (0, 0), (0, self.height), 5),
+            pymunk.Segment(space.static_body, (self.width, 0), (self.width, self.height), 5),
+            pymunk.Segment(space.static_body, (0, self.height), (self.width, self.height), 5),
+        ]
+        for line in static_lines:
+            line.elasticity = 0.9
+            line.friction = 0.7
+        space.add(*static_lines)
+        return space
+
+    @property
+    def objects(self):
+        return self.registry.by_id.values()
+
+    @property
+    def joints(self):
+        return self.registry.joints.values()
+
+    @property
+    def iterations(self):
+        return self.space.iterations
+
+    @iterations.setter
+    def iterations(self, value):
+        # Iterasi solver; disimpan di space dan ikut terbawa saat space dibangun ulang
+        self.space.iterations = value
+
+    # --- Langkah Simulasi ---
+    def set_world(self, gravity_y, damping):
+        if gravity_y != self.space.gravity.y:
+            self.space.gravity = (0, gravity_y) # Chipmunk membangunkan semua body tidur setiap gravitasi diset
+        self.space.damping = damping
+
+    def set_sleeping(self, sleep_time, idle_speed):
+        # sleep_time <= 0 menonaktifkan sleeping; idle_speed 0 = ambang otomatis Chipmunk
+        if (sleep_time, idle_speed) == (self.sleep_time, self.idle_speed): return
+        if sleep_time <= 0 and self.sleep_time is not None and self.sleep_time > 0:
+            self.wake_all() # tanpa ambang, body yang tertidur tidak akan bangun sendiri
+        self.sleep_time, self.idle_speed = sleep_time, idle_speed
+        self.space.sleep_time_threshold = sleep_time if sleep_time > 0 else math.inf
+        self.space.idle_speed_threshold = idle_speed
+
+    def wake_all(self):
+        for record in self.registry:
+            record['shape'].body.activate()
+
+    def sleeping_mask(self):
+        return np.fromiter([record['shape'].body.is_sleeping for record in self.registry],
+                           dtype=bool, count=len(self.registry))
+
+    def step(self, dt=None):
+        dt = self.dt if dt is None else dt
+        with self.lock:
+            if self.history is None:
+                self._advance(dt, self.substeps)
+                return
+            self._record_step(dt)
+            start = time.perf_counter()
+            self._advance(dt, self.substeps)
+            self.history.step_time += time.perf_counter() - start
+
+    def _advance(self, dt, substeps):
+        sub_dt = dt / substeps
+        if self.drag_joint is not None:
+            self.drag_joint.b.activate() # body yang diseret tidak boleh tertidur
+        for _ in range(substeps):
+            self.space.step(sub_dt)
+        self.step_count += 1
+        self.sim_time += dt
+
+    def pose_snapshot(self):
+        records = list(self.registry)
+        bodies = [record['shape'].body for record in records]
+        positions = gather_vectors(bodies, 'position')
+        angles = gather_scalars(bodies, 'angle')
+        sleeping = self.sleeping_mask() if self.sleep_time > 0 else None
+        return PoseSnapshot(self.registry.version, records, positions, angles, sleeping)
+
+    def store_prev_poses(self):
+        # Simpan pose sebelum langkah terakhir sebuah frame untuk interpolasi
+        self.prev_snapshot = self.pose_snapshot()
+
+    def interpolated_snapshot(self, alpha):
+        return interpolate_snapshots(self.prev_snapshot, self.pose_snapshot(), alpha)
+
+    def set_telemetry(self, enabled):
+        # Mulai/berhenti mengumpulkan telemetri semua objek; riwayat lama dibuang (dan memorinya dilepas)
+        with self.lock:
+            self.data_collector.reset()
+            self.data_collector.enabled = enabled
+
+    def record_data(self):
+        if not self.data_collector.enabled: return
+        self.data_collector.update(self.registry, self.space.gravity.y, skip_sleeping=self.sleep_time > 0)
+
+    def run(self, steps, record=False):
+        # Jalankan secepat CPU mengizinkan, kembalikan jumlah langkah per detik
+        start = time.perf_counter()
+        for _ in range(steps):
+            self.step()
+            if record: self.record_data()
+        elapsed = time.perf_counter() - start
+        return steps / elapsed if elapsed > 0 else float('inf')
+
+    # --- Pembuatan Objek ---
+    def _batch_arrays(self, obj_type, positions, mass, friction, elasticity, velocities=None,
+                      radius=0.0, size=(0, 0), vertices=None):
+        # Array scene untuk sekelompok objek sejenis (format add_objects_from_arrays)
+        n = len(positions)
+        ids = np.arange(self.next_body_id, self.next_body_id + n, dtype=np.int64)
+        vertices = np.zeros((0, 2)) if vertices is None else np.asarray(vertices, dtype=float).reshape(-1, 2)
+        return {
+            'id': ids,
+            'type': np.full(n, OBJECT_TYPES.index(obj_type), dtype=np.uint8),
+            'pos': np.asarray(positions, dtype=float).reshape(-1, 2),
+            'vel': np.zeros((n, 2)) if velocities is None else np.asarray(velocities, dtype=float).reshape(-1, 2),
+            'angle': np.zeros(n),
+            'ang_vel': np.zeros(n),
+            'mass': np.full(n, float(mass)),
+            'friction': np.full(n, float(friction)),
+            'elasticity': np.full(n, float(elasticity)),
+            'radius': np.full(n, float(radius)),
+            'size': np.tile(np.asarray(size, dtype=float), (n, 1)),
+            'vert_offsets': np.arange(n + 1, dtype=np.int64) * (len(vertices) // max(n, 1)),
+            'vertices': np.tile(vertices, (n, 1)),
+        }
+
+    def spawn_objects(self, arrays):
+        # Tambahkan sekelompok objek sekaligus; dalam riwayat dicatat sebagai event, tanpa keyframe baru
+        version = self.registry.version
+        bodies = self.add_objects_from_arrays(arrays, 0, len(arrays['id']))
+        if len(arrays['id']): self.next_body_id = max(self.next_body_id, int(arrays['id'].max()) + 1)
+        history = self.history
+        if history is not None and history.keyframes and history.version == version:
+            if self.step_count != history.last_step: history.truncate(self.step_count)
+            history.record_spawn(arrays)
+            history.version = self.registry.version
+        return bodies
+
+    def add_circles(self, positions, radius=40, density=1.0, friction=0.7, elasticity=0.8, velocities=None):
+        mass = density * math.pi * radius**2 / 1000
+        return self.spawn_objects(self._batch_arrays('circle', positions, mass, friction, elasticity, velocities, radius=radius))
+
+    def add_boxes(self, positions, size=(80, 80), density=1.0, friction=0.7, elasticity=0.8, velocities=None):
+        mass = density * size[0] * size[1] / 1000
+        return self.spawn_objects(self._batch_arrays('box', positions, mass, friction, elasticity, velocities, size=size))
+
+    def add_circle(self, pos, radius=40, density=1.0, friction=0.7, elasticity=0.8):
+        return self.add_circles([pos], radius, density, friction, elasticity)[0]
+
+    def add_box(self, pos, size=(80, 80), density=1.0, friction=0.7, elasticity=0.8):
+        return self.add_boxes([pos], size, density, friction, elasticity)[0]
+
+    def add_polygon(self, points, density=1.0, friction=0.7, elasticity=0.8):
+        mass = density * 10
+        # Body diletakkan di titik berat poligon; momen dihitung terhadap titik itu
+        center = pymunk.Poly(None, points).center_of_gravity
+        local_verts = [tuple(pymunk.Vec2d(*p) - center) for p in points]
+        arrays = self._batch_arrays('polygon', [tuple(center)], mass, friction, elasticity, vertices=local_verts)
+        return self.spawn_objects(arrays)[0]
+
+    def add_joint(self, joint_type, body_a, body_b, anchor_a, anchor_b, rest_length=None, stiffness=2000, damping=30):
+        if joint_type == 'pin':
+            constraint = pymunk.PinJoint(body_a, body_b, anchor_a, anchor_b)
+            if rest_length is not None: constraint.distance = rest_length
+        elif joint_type == 'spring':
+            if rest_length is None:
+                rest_length = body_a.position.get_distance(body_b.position)
+            constraint = pymunk.DampedSpring(body_a, body_b, anchor_a, anchor_b, rest_length, stiffness, damping)
+        else:
+            return None
+        self.registry.add_joint({'type': joint_type, 'constraint': constraint})
+        self.space.add(constraint)
+        return constraint
+
+    # --- Seret Objek ---
+    def start_drag(self, body, point):
+        self.end_drag()
+        self.mouse_body.position = point
+        self.drag_joint = pymunk.PivotJoint(self.mouse_body, body, point)
+        self.drag_joint.max_force = 50000 * body.mass
+        self.space.add(self.drag_joint)
+        if self.history is not None: self.history.force_keyframe = True
+
+    def move_drag(self, point):
+        self.mouse_body.position = point
+
+    def end_drag(self):
+        if self.drag_joint is None: return
+        self.space.remove(self.drag_joint)
+        self.drag_joint = None
+        if self.history is not None: self.history.force_keyframe = True
+
+    # --- Pencarian & Penghapusan ---
+    def get_body_by_id(self, body_id):
+        record = self.registry.get(body_id)
+        return record['shape'].body if record else None
+
+    def remove_object(self, body_to_remove):
+        if self.drag_joint is not None and self.drag_joint.b == body_to_remove:
+            self.end_drag()
+        obj_to_remove, joints_to_remove = self.registry.remove_object(body_to_remove)
+        # Hapus sambungan yang terhubung, lalu objek dan bentuknya
+        for joint in joints_to_remove:
+            self.space.remove(joint['constraint'])
+        if obj_to_remove:
+            self.space.remove(obj_to_remove['shape'], body_to_remove)
+            self._release(obj_to_remove)
+        return obj_to_remove is not None
+
+    def _release(self, record):
+        # Lingkaran dan kotak kembali ke pool; poligon (bentuk bebas) dibiarkan
+        shape = record['shape']
+        if record['type'] == 'circle':
+            self.pool.release(('circle', shape.radius), shape.body, shape)
+        elif record['type'] == 'box':
+            self.pool.release(('box', tuple(record['size'])), shape.body, shape)
+
+    def clear(self):
+        for j in list(self.space.constraints): self.space.remove(j)
+        records = list(self.registry)
+        for s in list(self.space.shapes):
+            if s.body.body_type == pymunk.Body.DYNAMIC:
+                self.space.remove(s, s.body)
+        for record in records: self._release(record)
+
+        self.drag_joint = None
+        self.registry.clear()
+        self.prev_snapshot = None
+        self.data_collector.reset()
+        self.next_body_id = 0
+
+    # --- Simpan & Muat Scene ---
+    def _static_columns(self, records):
+        # Kolom yang tidak berubah selama simulasi, di-cache per versi registri
+        if self._static_cache[0] == self.registry.version:
+            return self._static_cache[1]
+        vertex_lists = [record['vertices'] if record['type'] == 'polygon' else [] for record in records]
+        counts = [len(verts) for verts in vertex_lists]
+        columns = {
+            'id': np.array([record['id'] for record in records], dtype=np.int64),
+            'type': np.array([OBJECT_TYPES.index(record['type']) for record in records], dtype=np.uint8),
+            'radius': np.array([record['shape'].radius if record['type'] == 'circle' else 0 for record in records], dtype=float),
+            'size': np.array([record.get('size', (0, 0)) for record in records], dtype=float).reshape(-1, 2),
+            'vert_offsets': np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            'vertices': np.array([tuple(v) for verts in vertex_lists for v in verts], dtype=float).reshape(-1, 2),
+            # Massa dan material ditetapkan saat objek dibuat
+            'mass': gather_scalars([record['shape'].body for record in records], 'mass'),
+            'friction': gather_scalars([record['shape'] for record in records], 'friction'),
+            'elasticity': gather_scalars([record['shape'] for record in records], 'elasticity'),
+        }
+
+        # Sambungan juga hanya berubah bersama versi registri
+        joints = list(self.joints)
+        constraints = [joint['constraint'] for joint in joints]
+        springs = [joint['type'] == 'spring' for joint in joints]
+        ids_a = [self.registry.id_of(c.a) for c in constraints]
+        ids_b = [self.registry.id_of(c.b) for c in constraints]
+        columns.update({
+            'joint_type': np.array([JOINT_TYPES.index(joint['type']) for joint in joints], dtype=np.uint8),
+            'joint_a': np.array([-1 if i is None else i for i in ids_a], dtype=np.int64),
+            'joint_b': np.array([-1 if i is None else i for i in ids_b], dtype=np.int64),
+            'anchor_a': gather_vectors(constraints, 'anchor_a'),
+            'anchor_b': gather_vectors(constraints, 'anchor_b'),
+            # Untuk pin: jarak pin
+            'rest_length': np.array([c.rest_length if spring else c.distance for c, spring in zip(constraints, springs)], dtype=float),
+            'stiffness': np.array([c.stiffness if spring else 2000 for c, spring in zip(constraints, springs)], dtype=float),
+            'damping': np.array([c.damping if spring else 30 for c, spring in zip(constraints, springs)], dtype=float),
+        })
+        self._static_cache = (self.registry.version, columns)
+        return columns
+
+    def body_state(self, records=None):
+        # pos, vel, angle, ang_vel semua body dalam urutan registri. pymunk.batch membaca semuanya sekaligus
+        # dalam urutan space; baris dipetakan ke urutan registri lewat id body (di-cache per versi registri)
+        records = list(self.registry) if records is None else records
+        bodies = [record['shape'].body for record in records]
+        if self._body_ids[0] != self.registry.version:
+            self._body_ids = (self.registry.version, np.array([body.id for body in bodies], dtype=np.intp))
+        registry_ids = self._body_ids[1]
+        buffer = pymunk.batch.Buffer()
+        pymunk.batch.get_space_bodies(self.space, BATCH_FIELDS, buffer)
+        ids = np.frombuffer(buffer.int_buf(), dtype=np.intp)
+        sorter = np.argsort(ids)
+        rows = sorter[np.minimum(np.searchsorted(ids, registry_ids, sorter=sorter), max(len(ids) - 1, 0))]
+        if len(ids) and np.array_equal(ids[rows], registry_ids):
+            data = np.frombuffer(buffer.float_buf()).reshape(len(ids), 6)[rows]
+            return data[:, 0:2].copy(), data[:, 3:5].copy(), data[:, 2].copy(), data[:, 5].copy()
+        # Ada body registri di luar space (mis. scene kosong): baca per body
+        return (gather_vectors(bodies, 'position'), gather_vectors(bodies, 'velocity'),
+                gather_scalars(bodies, 'angle'), gather_scalars(bodies, 'angular_velocity'))
+
+    def scene_arrays(self, extra=None):
+        # Salin keadaan scene ke array numpy biasa (aman diproses di luar loop fisika)
+        records = list(self.registry)
+        arrays = dict(self._static_columns(records))
+        pos, vel, angle, ang_vel = self.body_state(records)
+        arrays.update({'pos': pos, 'vel': vel, 'angle': angle, 'ang_vel': ang_vel})
+        arrays['meta'] = {
+            'next_body_id': self.next_body_id,
+            'world': {'gravity_y': self.space.gravity.y, 'damping': self.space.damping,
+                      'sleep_time': self.sleep_time, 'idle_speed': self.idle_speed},
+        }
+        if extra:
+            arrays['meta'].update(extra)
+        return arrays
+
+    def save_scene(self, filename="scene.json", extra=None, writer=None):
+        # .npz = format biner kolumnar, selain itu JSON; dengan writer, penulisan terjadi di thread writer
+        arrays = self.scene_arrays(extra)
+        if writer:
+            return writer.save(filename, arrays)
+        write_scene_atomic(filename, arrays)
+        print(f"Scene saved to {filename}")
+        return True
+
+    def open_scene(self, filename="scene.json", chunk_size=LOAD_CHUNK_SIZE):
+        # Baca file dan kosongkan dunia; objek ditambahkan oleh SceneLoader yang dikembalikan
+        try:
+            arrays = read_scene(filename)
+        except FileNotFoundError:
+            print(f"Error: {filename} not found.")
+            return None
+        except (json.JSONDecodeError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            print(f"Error reading scene file: {e}")
+            return None
+        return self.open_arrays(arrays, filename, chunk_size)
+
+    def open_arrays(self, arrays, name=None, chunk_size=LOAD_CHUNK_SIZE):
+        # Seperti open_scene, tetapi dari array scene yang sudah ada di memori
+        self.clear()
+        meta = arrays['meta']
+        self.next_body_id = meta.get('next_body_id', 0)
+        world_data = meta.get('world', {})
+        self.set_world(world_data.get('gravity_y', -981), world_data.get('damping', 0.998))
+        self.set_sleeping(world_data.get('sleep_time', SLEEP_TIME_THRESHOLD), world_data.get('idle_speed', IDLE_SPEED_THRESHOLD))
+        return SceneLoader(self, arrays, name, chunk_size)
+
+    def load_scene(self, filename="scene.json"):
+        # Muat sekaligus; kembalikan meta scene agar pemanggil bisa membaca kamera dll.
+        loader = self.open_scene(filename, chunk_size=None)
+        if loader is None:
+            return None
+        loader.run()
+        return loader.meta
+
+    def add_objects_from_arrays(self, arrays, start, stop):
+        ids, types = arrays['id'][start:stop].tolist(), arrays['type'][start:stop].tolist()
+        pos, vel = arrays['pos'][start:stop].tolist(), arrays['vel'][start:stop].tolist()
+        angle, ang_vel = arrays['angle'][start:stop].tolist(), arrays['ang_vel'][start:stop].tolist()
+        mass = arrays['mass'][start:stop].tolist()
+        friction, elasticity = arrays['friction'][start:stop].tolist(), arrays['elasticity'][start:stop].tolist()
+        radius, size = arrays['radius'][start:stop].tolist(), arrays['size'][start:stop].tolist()
+        offsets = arrays['vert_offsets'][start:stop + 1].tolist()
+        vertices = arrays['vertices']
+
+        items, records = [], []
+        for i in range(len(ids)):
+            obj_type = OBJECT_TYPES[types[i]]
+            if obj_type == 'circle':
+                body, shape = self.pool.acquire(('circle', radius[i]))
+                body.mass, body.moment = mass[i], pymunk.moment_for_circle(mass[i], 0, radius[i])
+                record = {'id': ids[i], 'type': 'circle', 'shape': shape}
+            elif obj_type == 'box':
+                box_size = tuple(size[i])
+                body, shape = self.pool.acquire(('box', box_size))
+                body.mass, body.moment = mass[i], pymunk.moment_for_box(mass[i], box_size)
+                record = {'id': ids[i], 'type': 'box', 'size': box_size, 'shape': shape}
+            else:
+                verts = [tuple(v) for v in vertices[offsets[i]:offsets[i + 1]].tolist()]
+                body = pymunk.Body(mass[i], pymunk.moment_for_poly(mass[i], verts))
+                shape = pymunk.Poly(body, verts)
+                record = {'id': ids[i], 'type': 'polygon', 'vertices': verts, 'shape': shape}
+            body.position = pos[i]
+            body.angle = angle[i]
+            body.velocity = vel[i]
+            body.angular_velocity = ang_vel[i]
+            shape.friction = friction[i]
+            shape.elasticity = elasticity[i]
+            items += (body, shape)
+            records.append(record)
+
+        # Satu panggilan space.add untuk seluruh chunk
+        self.space.add(*items)
+        for record in records:
+            self.registry.add_object(record)
+        return items[::2]
+
+    def add_joints_from_arrays(self, arrays, start, stop):
+        joint_types = arrays['joint_type'][start:stop].tolist()
+        body_a, body_b = arrays['joint_a'][start:stop].tolist(), arrays['joint_b'][start:stop].tolist()
+        anchor_a, anchor_b = arrays['anchor_a'][start:stop].tolist(), arrays['anchor_b'][start:stop].tolist()
+        rest_length = arrays['rest_length'][start:stop].tolist()
+        stiffness, damping = arrays['stiffness'][start:stop].tolist(), arrays['damping'][start:stop].tolist()
+        for i in range(len(joint_types)):
+            a, b = self.get_body_by_id(body_a[i]), self.get_body_by_id(body_b[i])
+            if not a or not b: continue
+            rest = None if math.isnan(rest_length[i]) else rest_length[i]
+            self.add_joint(JOINT_TYPES[joint_types[i]], a, b, tuple(anchor_a[i]), tuple(anchor_b[i]),
+                           rest, stiffness[i], damping[i])
+
+    # --- Riwayat & Replay ---
+    def start_history(self, keyframe_steps=HISTORY_KEYFRAME_STEPS, memory_budget=HISTORY_MEMORY_BYTES):
+        self.history = StateHistory(keyframe_steps, memory_budget)
+
+    def stop_history(self):
+        self.history = None
+
+    def _copy_constraint(self, c):
+        if isinstance(c, pymunk.DampedSpring):
+            copy = pymunk.DampedSpring(c.a, c.b, c.anchor_a, c.anchor_b, c.rest_length, c.stiffness, c.damping)
+        elif isinstance(c, pymunk.PinJoint):
+            copy = pymunk.PinJoint(c.a, c.b, c.anchor_a, c.anchor_b)
+            copy.distance = c.distance
+        else:
+            copy = pymunk.PivotJoint(c.a, c.b, c.anchor_a, c.anchor_b)
+        copy.max_force, copy.max_bias = c.max_force, c.max_bias
+        copy.error_bias, copy.collide_bodies = c.error_bias, c.collide_bodies
+        return copy
+
+    def rebuild_space(self, sleeping=None):
+        # Pindahkan semua objek ke space baru dalam urutan registri. Cache kontak, impuls sambungan dan
+        # indeks spasial jadi bersih, sehingga langkah berikutnya hanya ditentukan oleh state body.
+        # sleeping: mask body yang ditidurkan lagi (default: yang sedang tidur); timer diam mulai dari nol
+        if sleeping is None: sleeping = self.sleeping_mask()
+        old = self.space
+        space = self._new_space()
+        for attr in SPACE_SETTINGS:
+            setattr(space, attr, getattr(old, attr))
+        records = list(self.registry)
+        items = [item for record in records for item in (record['shape'].body, record['shape'])]
+        old.remove(*old.constraints, *items)
+        for record in records:
+            # Integrasi dengan dt 0 membuang koreksi bias (v_bias) yang tersisa dari langkah sebelumnya
+            pymunk.Body.update_position(record['shape'].body, 0.0)
+            record['shape'].body.activate() # timer diam kembali ke nol
+
+        constraints = []
+        for c in list(self.registry.joints):
+            copy = self._copy_constraint(c)
+            self.registry.replace_constraint(c, copy)
+            constraints.append(copy)
+        if self.drag_joint is not None:
+            self.drag_joint = self._copy_constraint(self.drag_joint)
+            constraints.append(self.drag_joint)
+        space.add(*items, *constraints)
+        self.space = space
+        for i in np.flatnonzero(sleeping).tolist():
+            records[i]['shape'].body.sleep()
+
+    def capture_keyframe(self):
+        # Snapshot murni: state disalin ke array, space yang sedang berjalan tidak disentuh (cache kontak dan
+        # impuls sambungan tetap utuh, jadi merekam tidak mengubah simulasi yang direkam)
+        start = time.perf_counter()
+        scene = self.scene_arrays()
+        scene['sleeping'] = self.sleeping_mask()
+        drag = None
+        if self.drag_joint is not None:
+            c = self.drag_joint
+            drag = (self.registry.id_of(c.b), tuple(c.anchor_a), tuple(c.anchor_b), c.max_force)
+        interval = self.history.interval_for(time.perf_counter() - start)
+        keyframe = Keyframe(self.step_count, self.sim_time, scene, drag, interval)
+        self.history.add_keyframe(keyframe, self.registry.version)
+
+    def _record_step(self, dt):
+        history = self.history
+        self.replay_keyframe = None # simulasi langsung berlanjut dari sini
+        if self.step_count != history.last_step:
+            history.truncate(self.step_count) # melanjutkan dari titik lampau: riwayat setelahnya dibuang
+        if history.needs_keyframe(self.registry.version):
+            self.capture_keyframe()
+        target = self.mouse_body.position
+        history.record_input((dt, self.substeps, self.space.iterations, self.space.gravity.y, self.space.damping,
+                              self.sleep_time, self.idle_speed, self.drag_joint is not None, target.x, target.y))
+
+    def restore_keyframe(self, keyframe):
+        scene = keyframe.scene
+        records = list(self.registry)
+        if self.drag_joint is not None:
+            self.space.remove(self.drag_joint)
+            self.drag_joint = None
+        if self._static_columns(records)['id'] is keyframe.static:
+            # Struktur sama: cukup tulis ulang state body
+            pos, vel = scene['pos'].tolist(), scene['vel'].tolist()
+            angle, ang_vel = scene['angle'].tolist(), scene['ang_vel'].tolist()
+            for i, record in enumerate(records):
+                body = record['shape'].body
+                body.position = pos[i]
+                body.velocity = vel[i]
+                body.angle = angle[i]
+                body.angular_velocity = ang_vel[i]
+            world_data = scene['meta']['world']
+            self.set_world(world_data['gravity_y'], world_data['damping'])
+            self.set_sleeping(world_data['sleep_time'], world_data['idle_speed'])
+        else:
+            # Struktur berbeda (objek ditambah/dihapus sejak itu): bangun ulang scene dari array
+            self.open_arrays(scene, chunk_size=None).run()
+            static = {key: value for key, value in scene.items() if key != 'meta' and key not in DYNAMIC_COLUMNS}
+            self._static_cache = (self.registry.version, static)
+        if keyframe.drag is not None:
+            body_id, anchor_a, anchor_b, max_force = keyframe.drag
+            self.drag_joint = pymunk.PivotJoint(self.mouse_body, self.get_body_by_id(body_id), anchor_a, anchor_b)
+            self.drag_joint.max_force = max_force
+            self.space.add(self.drag_joint)
+        self.step_count = keyframe.step
+        self.sim_time = keyframe.sim_time
+        self.prev_snapshot = None
+        # Putar ulang selalu dimulai dari space bersih, jadi seek ke langkah yang sama selalu memberi state
+        # yang sama (simulasi langsung tidak pernah dibangun ulang; hasil putar ulang bisa sedikit berbeda darinya)
+        self.rebuild_space(scene['sleeping'])
+        self.history.version = self.registry.version
+        self.replay_keyframe = keyframe
+        self._replay_spawns(keyframe, 0)
+
+    def seek(self, step):
+        # Kembali ke langkah mana pun dalam riwayat: muat keyframe terdekat lalu simulasi ulang input tercatat
+        history = self.history
+        if not history: return self.step_count
+        step = max(history.first_step, min(step, history.last_step))
+        keyframe = history.keyframe_for(step)
+        with self.lock:
+            # Lanjut dari state sekarang hanya bila state itu hasil putar ulang keyframe yang sama
+            on_timeline = history.version == self.registry.version and self.replay_keyframe is keyframe
+            if not (on_timeline and keyframe.step <= self.step_count <= step):
+                self.restore_keyframe(keyframe)
+            start = self.step_count - keyframe.step
+            for offset, row in enumerate(keyframe.inputs[start:step - keyframe.step].tolist(), start + 1):
+                self._replay_step(row)
+                self._replay_spawns(keyframe, offset)
+        return self.step_count
+
+    def _replay_step(self, row):
+        dt, substeps, iterations, gravity_y, damping, sleep_time, idle_speed, drag, drag_x, drag_y = row
+        self.space.iterations = int(iterations)
+        self.set_world(gravity_y, damping)
+        self.set_sleeping(sleep_time, idle_speed)
+        if drag: self.mouse_body.position = (drag_x, drag_y)
+        self._advance(dt, int(substeps))
+
+    def _replay_spawns(self, keyframe, offset):
+        for arrays in keyframe.spawns.get(offset, ()):
+            self.add_objects_from_arrays(arrays, 0, len(arrays['id']))
+            self.next_body_id = max(self.next_body_id, int(arrays['id'].max()) + 1)
+        if offset in keyframe.spawns: self.history.version = self.registry.version
+
+# --- Thread Fisika (mode multi-core) ---
+class PhysicsWorker:
+    def __init__(self, engine):
+        self.engine = engine
+        # (pose sebelum langkah terakhir, pose setelah batch terakhir): tuple tak berubah, diganti dengan
+        # satu assignment di akhir batch agar render tidak pernah memasangkan prev baru dengan pose lama
+        self.snapshots = (None, engine.pose_snapshot())
+        self.results = []
+        self.error = None
+        self._requests = queue.Queue()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="physics-step", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, steps, on_step=None):
+        # Jalankan langkah di thread fisika; hasil on_step tiap langkah diambil lewat wait()
+        self._idle.clear()
+        self._requests.put((steps, on_step))
+
+    def wait(self):
+        self._idle.wait()
+        results, self.results = self.results, []
+        error, self.error = self.error, None
+        if error: raise error
+        return results
+
+    def interpolated_snapshot(self, alpha):
+        prev, current = self.snapshots
+        return interpolate_snapshots(prev, current, alpha)
+
+    def stop(self):
+        self._idle.wait()
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self):
+        engine = self.engine
+        while True:
+            item = self._requests.get()
+            if item is None: break
+            steps, on_step = item
+            prev = self.snapshots[0] # tanpa langkah baru, pasangan interpolasi tetap sama
+            try:
+                for i in range(steps):
+                    with engine.lock:
+                        if i == steps - 1: prev = engine.pose_snapshot()
+                        engine.step()
+                        engine.record_data()
+                        if on_step: self.results.append(on_step())
+                with engine.lock:
+                    self.snapshots = (prev, engine.pose_snapshot())
+            except Exception as e:
+                self.error = e
+            finally:
+                self._idle.set()
+
+# --- Prediksi Lintasan (salinan scene disimulasikan di thread terpisah) ---
+PREDICT_HORIZON = 3.0        # detik ke depan
+PREDICT_STEP_BUDGET = 360    # langkah fisika maksimum per prediksi (membatasi biaya hitung ulang)
+PREDICT_CHUNK = 15           # langkah per potongan hasil yang dikirim ke render
+PREDICT_MAX_BODIES = 8       # body target + body yang ditabraknya
+PREDICT_REFRESH = 0.5        # fork ulang setelah simulasi langsung melewati porsi prediksi ini
+PREDICT_FORK_INTERVAL = 0.2  # detik minimum antar fork selama target seret bergerak atau struktur scene terus diedit
+
+class TrajectoryPredictor:
+    def __init__(self, horizon=PREDICT_HORIZON, step_budget=PREDICT_STEP_BUDGET, chunk=PREDICT_CHUNK,
+                 max_bodies=PREDICT_MAX_BODIES):
+        self.horizon = horizon
+        self.step_budget = step_budget
+        self.chunk = chunk
+        self.max_bodies = max_bodies
+        self.result = None # diganti utuh setiap potongan selesai, tidak pernah diubah setelahnya
+        self.forks = 0
+        self.error = None
+        self._generation = 0
+        self._key = None
+        self._drag = None
+        self._fork_step = 0
+        self._fork_time = 0.0
+        self._requests = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="trajectory-predictor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def steps_for(self, dt):
+        return max(1, min(self.step_budget, math.ceil(self.horizon / dt)))
+
+    def update(self, engine, body):
+        # Panggil saat fisika tidak berjalan; fork ulang hanya saat scene/dunia diedit, target berganti,
+        # target seret bergerak, atau simulasi langsung hampir melewati prediksi
+        if body is None:
+            if self._key is not None: self.cancel()
+            return
+        drag = tuple(engine.mouse_body.position) if engine.drag_joint is not None else None
+        key = (engine.registry.version, body, engine.space.gravity.y, engine.space.damping, engine.sleep_time,
+               engine.idle_speed, engine.dt, engine.substeps, engine.iterations, drag is not None)
+        elapsed = engine.step_count - self._fork_step
+        recent = time.perf_counter() - self._fork_time < PREDICT_FORK_INTERVAL
+        if key == self._key and 0 <= elapsed < self.steps_for(engine.dt) * PREDICT_REFRESH:
+            if drag == self._drag or recent: return
+        elif self._key is not None and key[1:] == self._key[1:] and recent:
+            # Hanya struktur yang berubah (mis. emitter berjalan): kolom statis disalin ulang paling sering
+            # sekali per interval; key lama dipertahankan sehingga fork menyusul di frame berikutnya
+            return
+        self.fork(engine, body)
+        self._key, self._drag = key, drag
+
+    def fork(self, engine, body):
+        # Salin state engine ke array (dibangun ulang di thread prediksi); prediksi lama dibatalkan.
+        # scene_arrays memakai kolom statis yang di-cache per versi registri dan membaca state body sekaligus
+        # lewat pymunk.batch, jadi salinan penuh kolom statis hanya terjadi setelah edit struktur
+        drag = None
+        if engine.drag_joint is not None:
+            joint = engine.drag_joint
+            drag = (engine.registry.id_of(joint.b), tuple(joint.b.local_to_world(joint.anchor_b)),
+                    tuple(engine.mouse_body.position))
+        self._submit({
+            'arrays': engine.scene_arrays(), 'size': (engine.width, engine.height),
+            'dt': engine.dt, 'substeps': engine.substeps, 'iterations': engine.iterations,
+            'target': engine.registry.id_of(body), 'drag': drag, 'step': engine.step_count,
+        })
+        self._fork_step, self._fork_time = engine.step_count, time.perf_counter()
+        self.forks += 1
+
+    def cancel(self):
+        self._submit(None)
+        self._key = self._drag = None
+
+    def stop(self, wait=True):
+        self._submit(None)
+        self._requests.put(None)
+        if wait: self._thread.join()
+
+    def _submit(self, request):
+        # Hanya permintaan terbaru yang berarti; yang belum dimulai dibuang, yang berjalan berhenti di potongan berikutnya
+        self._generation += 1
+        self.result = None
+        try:
+            self._requests.get_nowait()
+        except queue.Empty:
+            pass
+        if request is not None: self._requests.put((self._generation, request))
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            if item is None: break
+            generation, request = item
+            try:
+                self._predict(generation, request)
+            except Exception as e:
+                self.error = e
+                print(f"Trajectory prediction failed: {e}")
+
+    def _predict(self, generation, request):
+        engine = SimulationEngine(*request['size'], request['dt'], request['substeps'])
+        engine.open_arrays(request['arrays'], chunk_size=None).run()
+        engine.iterations = request['iterations']
+        if request['drag'] is not None:
+            drag_id, anchor, target = request['drag']
+            drag_body = engine.get_body_by_id(drag_id)
+            if drag_body is not None:
+                engine.start_drag(drag_body, anchor)
+                engine.move_drag(target) # target seret dianggap diam selama horizon
+        body = engine.get_body_by_id(request['target'])
+        if body is None: return
+
+        steps = self.steps_for(request['dt'])
+        # Baris per body; body yang ditabrak baru terisi sejak langkah tabrakan (sebelumnya NaN)
+        positions = np.full((self.max_bodies, steps + 1, 2), np.nan)
+        positions[0, 0] = tuple(body.position)
+        tracked = [body]
+        for start in range(0, steps, self.chunk):
+            if generation != self._generation: return # scene diedit, prediksi ini sudah usang
+            stop = min(start + self.chunk, steps)
+            for step in range(start + 1, stop + 1):
+                engine.step()
+                if len(tracked) < self.max_bodies: self._track_hits(tracked)
+                positions[:len(tracked), step] = gather_vectors(tracked, 'position')
+            if generation != self._generation: return
+            self.result = {'step': request['step'], 'count': stop + 1, 'bodies': len(tracked), 'positions': positions}
+            time.sleep(0) # beri giliran ke thread render di antara potongan
+
+    def _track_hits(self, tracked):
+        hits = []
+        for body in tracked:
+            body.each_arbiter(lambda arbiter: hits.extend(shape.body for shape in arbiter.shapes))
+        for body in hits:
+            if len(tracked) >= self.max_bodies: break
+            if body.body_type == pymunk.Body.DYNAMIC and body not in tracked:
+                tracked.append(body)
+
+# --- Mode Headless ---
+if __name__ == '__main__':
+    # Pemakaian: python simulation.py scene.json [detik_simulasi] [--threaded]
+    args = [arg for arg in sys.argv[1:] if arg != '--threaded']
+    scene_file = args[0] if len(args) > 0 else "scene.json"
+    seconds = float(args[1]) if len(args) > 1 else 60.0
+    engine = SimulationEngine(threaded='--threaded' in sys.argv)
+    if engine.load_scene(scene_file) is not None:
+        steps = int(seconds / engine.dt)
+        rate = engine.run(steps)
+        print(f"{steps} steps in {steps / rate:.2f}s ({rate:.0f} steps/s, {rate * engine.dt:.1f}x real time)")
@@ -0,0 +1,131 @@
+import numpy as np
+import argparse
+import csv
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from simulation import SimulationEngine, PARAMETER_RANGES, gather_vectors
+from scene_io import OBJECT_TYPES, read_scene
+
+# --- Konfigurasi Sweep ---
+SWEEP_SECONDS = 10.0
+SETTLE_SPEED = 5.0 # kecepatan maksimum (px/s) agar scene dianggap diam
+SWEEP_RESULT_FIELDS = ['final_ke', 'final_pe', 'final_energy', 'max_speed', 'settle_time', 'steps_per_sec']
+
+# --- Sampel Parameter ---
+def grid_samples(points_per_param, params=None):
+    # Grid penuh: points_per_param nilai merata per parameter
+    params = params or list(PARAMETER_RANGES)
+    axes = [np.linspace(PARAMETER_RANGES[p][0], PARAMETER_RANGES[p][1], points_per_param).tolist() for p in params]
+    return [dict(zip(params, values)) for values in itertools.product(*axes)]
+
+def random_samples(count, params=None, seed=None):
+    # Sampel acak seragam di dalam rentang setiap parameter
+    params = params or list(PARAMETER_RANGES)
+    rng = np.random.default_rng(seed)
+    columns = {p: rng.uniform(PARAMETER_RANGES[p][0], PARAMETER_RANGES[p][1], count).tolist() for p in params}
+    return [{p: columns[p][i] for p in params} for i in range(count)]
+
+def apply_parameters(arrays, params):
+    # Salinan array scene dengan material dan dunia diganti; massa dihitung ulang seperti alat di sandbox
+    arrays = dict(arrays)
+    n = len(arrays['id'])
+    if 'density' in params:
+        density = params['density']
+        types = arrays['type']
+        mass = np.full(n, density * 10.0) # poligon
+        circle = types == OBJECT_TYPES.index('circle')
+        box = types == OBJECT_TYPES.index('box')
+        mass[circle] = density * math.pi * arrays['radius'][circle] ** 2 / 1000
+        mass[box] = density * arrays['size'][box].prod(axis=1) / 1000
+        arrays['mass'] = mass
+    for key in ('friction', 'elasticity'):
+        if key in params:
+            arrays[key] = np.full(n, float(params[key]))
+    world = dict(arrays['meta'].get('world', {}))
+    for key in ('gravity_y', 'damping'):
+        if key in params:
+            world[key] = params[key]
+    arrays['meta'] = dict(arrays['meta'], world=world)
+    return arrays
+
+# --- Satu Run (dijalankan di proses worker) ---
+_scene_cache = {}
+
+def run_one(scene_file, params, seconds=SWEEP_SECONDS, settle_speed=SETTLE_SPEED):
+    if scene_file not in _scene_cache:
+        _scene_cache[scene_file] = read_scene(scene_file) # dibaca sekali per proses
+    engine = SimulationEngine()
+    engine.open_arrays(apply_parameters(_scene_cache[scene_file], params), scene_file, chunk_size=None).run()
+
+    bodies = [record['shape'].body for record in engine.registry]
+    steps = int(seconds / engine.dt)
+    max_speed = 0.0
+    last_moving = 0.0 # waktu terakhir ada objek yang lebih cepat dari settle_speed
+    start = time.perf_counter()
+    for _ in range(steps):
+        engine.step()
+        if not bodies: continue
+        vel = gather_vectors(bodies, 'velocity')
+        speed = np.sqrt((vel * vel).sum(axis=1).max())
+        max_speed = max(max_speed, speed)
+        if speed >= settle_speed: last_moving = engine.sim_time
+    elapsed = time.perf_counter() - start
+
+    engine.record_data()
+    sys_ke, sys_pe, sys_e = [float(engine.data_collector.latest(None, key)) for key in ('sys_ke', 'sys_pe', 'sys_e')]
+    return dict(params,
+                final_ke=sys_ke, final_pe=sys_pe, final_energy=sys_e, max_speed=float(max_speed),
+                # NaN = masih bergerak di akhir run
+                settle_time=last_moving if last_moving < engine.sim_time - engine.dt / 2 else math.nan,
+                steps_per_sec=steps / elapsed if elapsed > 0 else math.inf)
+
+# --- Sweep ---
+def run_sweep(scene_file, samples, seconds=SWEEP_SECONDS, workers=None, settle_speed=SETTLE_SPEED):
+    # Hasil berurutan sama dengan samples, satu dict per run
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_one, scene_file, params, seconds, settle_speed) for params in samples]
+        results = []
+        for i, future in enumerate(futures):
+            results.append(future.result())
+            print(f"Run {i + 1}/{len(futures)} done")
+    return results
+
+def write_results(filename, results):
+    if not results: return
+    fields = [key for key in results[0] if key not in SWEEP_RESULT_FIELDS] + SWEEP_RESULT_FIELDS
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Sweep results saved to {filename}")
+
+if __name__ == '__main__':
+    # Pemakaian: python sweep.py scene.json (--grid N | --random N) [--seconds S] [--workers W]
+    parser = argparse.ArgumentParser(description="Run a headless parameter sweep over a saved scene.")
+    parser.add_argument('scene', help="scene file (.json or .npz)")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--grid', type=int, metavar='N', help="N evenly spaced values per parameter")
+    mode.add_argument('--random', type=int, metavar='N', help="N uniformly random parameter sets")
+    parser.add_argument('--params', nargs='+', choices=list(PARAMETER_RANGES), default=list(PARAMETER_RANGES),
+                        help="parameters to vary (others keep the scene's values)")
+    parser.add_argument('--seconds', type=float, default=SWEEP_SECONDS, help="simulated seconds per run")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--settle-speed', type=float, default=SETTLE_SPEED)
+    parser.add_argument('--out', default=f"sweep_{int(time.time())}.csv")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.scene):
+        parser.error(f"{args.scene} not found.")
+    if args.grid:
+        samples = grid_samples(args.grid, args.params)
+    else:
+        samples = random_samples(args.random, args.params, args.seed)
+    print(f"Sweeping {len(samples)} runs of {args.seconds:g}s over {', '.join(args.params)}")
+    start = time.perf_counter()
+    results = run_sweep(args.scene, samples, args.seconds, args.workers, args.settle_speed)
+    print(f"{len(results)} runs in {time.perf_counter() - start:.1f}s")
+    write_results(args.out, results)
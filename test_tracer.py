@@ -0,0 +1,30 @@
+import math
+import numpy as np
+import pytest
+from simulation import PathTracer, TRACER_TOLERANCE
+
+class Body:
+    pass
+
+def trace_orbit(speed, radius=100.0, fps=60, turns=1.0):
+    tracer, body = PathTracer(), Body()
+    tracer.follow(body)
+    for k in range(int(turns * 2 * math.pi * radius / speed * fps) + 1):
+        angle = k * speed / fps / radius
+        tracer.append((tracer.bodies, np.array([[radius * math.cos(angle), radius * math.sin(angle)]])))
+    return tracer.trace(body)
+
+@pytest.mark.parametrize('speed', [30, 90, 200])
+def test_slow_orbit_keeps_its_shape(speed):
+    # Gerak lambat dulu merosot jadi tali busur 2 titik; sagitta tiap segmen harus tetap di bawah toleransi
+    points = trace_orbit(speed)
+    assert len(points) >= 12
+    midpoints = (points[:-1] + points[1:]) / 2
+    assert 100.0 - np.hypot(*midpoints.T).min() < TRACER_TOLERANCE
+
+def test_resting_body_keeps_two_points():
+    tracer, body = PathTracer(), Body()
+    tracer.follow(body)
+    for x in [0.0, 50.0] + [50.0] * 1000:
+        tracer.append((tracer.bodies, np.array([[x, 0.0]])))
+    assert len(tracer.trace(body)) == 2